@@ -8,11 +8,20 @@ Requirements:
 - Optional: set USER_DATA_DIR to reuse a Chrome profile (recommended)
 """
 
+import argparse
+import csv
+import json
 import os
 import time
 import traceback
+from datetime import date, datetime, timedelta, timezone
 import pandas as pd
-import undetected_chromedriver as uc
+import driver_factory
+import metrics
+from driver_factory import load_page
+from driver_pool import run_pool
+from snapshot_parser import save_snapshot, parse_archive_cards
+from embedded_state import decode_responses, find_state_blobs
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -22,30 +31,214 @@ from selenium.webdriver.common.action_chains import ActionChains
 # === CONFIG ===
 START_URL = "https://www.producthunt.com/"
 USER_DATA_DIR = r"D:/Work/chrome_profile"   # optional persistent profile
+LEAN_MODE = True  # block images, fonts, media and trackers (see driver_factory.py)
+HEADLESS = False  # headless Chrome is easier for the site to flag
+EAGER_LOAD = True  # driver.get returns at DOMContentLoaded
 WAIT_LONG = 30
 WAIT_VERY_LONG = 60
-SCROLL_PAUSE = 3  # seconds to wait after scroll
+SCROLL_PAUSE = 3  # seconds to wait after scroll (SCROLL_MODE = "poll")
+SCROLL_MODE = "observer"  # "observer": react to new cards as they arrive; "poll": fixed SCROLL_PAUSE
+BATCH_TIMEOUT_MIN = 4  # seconds to wait for a batch before declaring the list finished
+BATCH_TIMEOUT_MAX = 20  # upper bound for the adaptive batch timeout
+BATCH_SETTLE_MS = 300  # quiet period after the last new card before a batch counts as loaded
+REQUEST_GRACE_MS = 1500  # no request started within this time after a scroll = end of list
+BULK_EXTRACT = True  # read all cards with one execute_script call instead of per-card lookups
+SNAPSHOT_MODE = False  # save page_source to snapshots/ and parse it offline with lxml
+INCREMENTAL_HARVEST = True  # extract each scroll batch as it arrives and stream it to the CSV (not with SNAPSHOT_MODE)
+HARVEST_DETACH = "hide"  # harvested cards: "hide" them, None to leave them, or "empty" their contents (not on React-managed lists)
+# "hide" keeps layout and per-step cost flat, but hidden nodes stay in the DOM, so memory still grows with the list
+HARVEST_STATS = False  # debugging: print JS heap and DOM node count after each step (walks the whole DOM every time)
+CAPTURE_MODE = False  # decode cards (with makers) from the list's own JSON API responses instead of the DOM (INCREMENTAL_HARVEST only)
+CAPTURE_DIR = None  # e.g. "captures": also save every captured response, replayable with embedded_state.py
 
 # Output CSV filename
 OUTPUT_CSV = "output1.csv"
 
-def build_driver():
-    options = uc.ChromeOptions()
-    if USER_DATA_DIR:
-        os.makedirs(USER_DATA_DIR, exist_ok=True)
-        options.add_argument(f"--user-data-dir={USER_DATA_DIR}")
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    driver = uc.Chrome(options=options)
-    return driver
+# Date-range mode (--from/--to): one shard per launch day
+DAILY_ARCHIVE_URL = "https://www.producthunt.com/leaderboard/daily/{year}/{month}/{day}/all"
+SHARD_DIR = "archive_shards"
+SHARD_COLUMNS = ["Title", "URL", "Description", "Tags", "Votes"]
+CAPTURE_COLUMNS = SHARD_COLUMNS + ["Makers"]  # rows decoded from API responses also name the makers
+DAY_WORKERS = 3  # days crawled in parallel, one browser each
+
+STAGE = "archive"  # label for this stage in metrics.py
+
+def build_driver(user_data_dir=USER_DATA_DIR):
+    return driver_factory.build_driver(
+        user_data_dir, lean=LEAN_MODE, headless=HEADLESS, eager=EAGER_LOAD, stage=STAGE, capture=CAPTURE_MODE
+    )
 
 def wait_for_element_clickable(driver, locator, timeout=WAIT_LONG):
     wait = WebDriverWait(driver, timeout)
-    return wait.until(EC.element_to_be_clickable(locator))
+    with metrics.timed(STAGE, "wait"):
+        try:
+            return wait.until(EC.element_to_be_clickable(locator))
+        except TimeoutException:
+            metrics.count(STAGE, "timeout")
+            raise
 
 def wait_for_elements_present(driver, locator, timeout=WAIT_LONG):
     wait = WebDriverWait(driver, timeout)
-    return wait.until(EC.presence_of_all_elements_located(locator))
+    with metrics.timed(STAGE, "wait"):
+        try:
+            return wait.until(EC.presence_of_all_elements_located(locator))
+        except TimeoutException:
+            metrics.count(STAGE, "timeout")
+            raise
+
+# Shared by the extraction scripts below; mirrors the per-card Selenium lookups in extract_cards_dom()
+READ_CARD_JS = """
+const text = (root, sel) => {
+    const el = root.querySelector(sel);
+    return el ? el.innerText.trim() : null;
+};
+function readCard(card) {
+    if (!card.querySelector("button[data-test='vote-button']")) return null;
+    const nameEl = card.querySelector("div[data-test^='post-name-'] a");
+    if (!nameEl) return null;
+    const tags = Array.from(
+        card.querySelectorAll("div[data-sentry-component='TagList'] a"),
+        t => t.innerText.trim()
+    );
+    return {
+        Title: nameEl.innerText.trim(),
+        URL: nameEl.href,
+        Description: text(card, "div.text-16.font-normal") || "",
+        Tags: tags.join(", "),
+        Votes: text(card, "button[data-test='vote-button'] p") || "0"
+    };
+}
+"""
+
+# Runs in the browser; reads every card on the page
+EXTRACT_CARDS_JS = READ_CARD_JS + """
+return Array.from(document.querySelectorAll("section[data-test^='post-item-']"), readCard).filter(Boolean);
+"""
+
+# Runs in the browser; reads only the cards added since the last call (queued
+# by the loader's observer), then hides or empties them so the page does not lay
+# them out again. The full-DOM node count is only taken when `stats` is set.
+# In capture mode `known` holds the URLs already decoded from API responses, and
+# the batch is only read if one of its cards links elsewhere. The batch's card
+# URLs are returned either way, to pick its rows out of the decoded ones.
+HARVEST_CARDS_JS = READ_CARD_JS + """
+const [detach, known, stats] = arguments;
+const batch = window.__phLoader.pending.splice(0);
+const bare = href => href.split(/[?#]/)[0].replace(/\\/$/, "");
+const hrefs = [];
+for (const card of batch) {
+    const nameEl = card.querySelector("div[data-test^='post-name-'] a");
+    if (nameEl) hrefs.push(bare(nameEl.href));
+}
+const knownUrls = new Set(known || []);
+const read = known === null || hrefs.some(href => !knownUrls.has(href));
+const cards = [];
+for (const card of batch) {
+    if (read) {
+        const record = readCard(card);
+        if (record) cards.push(record);
+    }
+    // Cards stay in place so the page's own list rendering keeps working; emptying
+    // them breaks React's later updates to those nodes, so it is opt-in
+    if (detach === "hide") card.style.display = "none";
+    else if (detach === "empty") card.replaceChildren();
+}
+return {
+    cards: cards,
+    hrefs: hrefs,
+    domNodes: stats ? document.getElementsByTagName("*").length : null
+};
+"""
+
+# Installed once per page: a MutationObserver counts cards as they are added
+# (and queues them for HARVEST_CARDS_JS) and fetch/XHR are wrapped to track
+# in-flight requests. Only added nodes are inspected, so the cost per batch
+# does not grow with the number of cards already loaded.
+INSTALL_LOADER_JS = """
+if (window.__phLoader) return window.__phLoader.count;
+const SEL = "section[data-test^='post-item-']";
+const st = window.__phLoader = {
+    count: 0,
+    pending: [],
+    last: null,
+    lastChange: performance.now(),
+    inflight: 0,
+    requests: 0,
+    listeners: new Set(),
+};
+const notify = () => st.listeners.forEach(fn => fn());
+const track = (card) => {
+    if (card.__phSeen) return 0;
+    card.__phSeen = true;
+    st.pending.push(card);
+    st.last = card;
+    return 1;
+};
+document.querySelectorAll(SEL).forEach(track);
+st.count = st.pending.length;
+
+new MutationObserver((records) => {
+    let added = 0;
+    for (const record of records) {
+        for (const node of record.addedNodes) {
+            if (node.nodeType !== 1) continue;
+            if (node.matches(SEL)) added += track(node);
+            else node.querySelectorAll(SEL).forEach(card => { added += track(card); });
+        }
+    }
+    if (added) {
+        st.count += added;
+        st.lastChange = performance.now();
+        notify();
+    }
+}).observe(document.body, {childList: true, subtree: true});
+
+const started = () => { st.inflight++; st.requests++; notify(); };
+const ended = () => { st.inflight = Math.max(0, st.inflight - 1); notify(); };
+const origFetch = window.fetch;
+window.fetch = function (...args) {
+    started();
+    return origFetch.apply(this, args).finally(ended);
+};
+const origSend = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.send = function (...args) {
+    started();
+    this.addEventListener("loadend", ended, {once: true});
+    return origSend.apply(this, args);
+};
+return st.count;
+"""
+
+# Scrolls past the last card, then resolves as soon as a new batch has
+# rendered, the page makes no request (end of list) or the timeout expires.
+WAIT_FOR_BATCH_JS = """
+const [prevCount, timeoutMs, settleMs, graceMs, done] = arguments;
+const st = window.__phLoader;
+if (st.last && st.last.isConnected && st.last.style.display !== "none") st.last.scrollIntoView({block: "end"});
+window.scrollTo(0, document.documentElement.scrollHeight);
+
+const start = performance.now();
+const reqStart = st.requests;
+let finished = false;
+const finish = (reason) => {
+    if (finished) return;
+    finished = true;
+    st.listeners.delete(check);
+    clearInterval(timer);
+    done({count: st.count, reason: reason});
+};
+function check() {
+    const now = performance.now();
+    const quiet = now - st.lastChange;
+    // Long-lived analytics requests should not hold a rendered batch back for long
+    if (st.count > prevCount && quiet >= settleMs && (st.inflight === 0 || quiet >= 4 * settleMs)) return finish("batch");
+    if (st.count === prevCount && st.requests === reqStart && now - start >= graceMs) return finish("end");
+    if (now - start >= timeoutMs) return finish("timeout");
+}
+st.listeners.add(check);
+// Events drive the common case; the timer only covers settle/grace/timeout deadlines
+const timer = setInterval(check, 100);
+"""
 
 def scroll_to_load_all(driver, pause_time=SCROLL_PAUSE, max_empty_scrolls=3):
     empty_scrolls = 0
@@ -68,107 +261,387 @@ def scroll_to_load_all(driver, pause_time=SCROLL_PAUSE, max_empty_scrolls=3):
             last_card = product_cards[-1]
             ActionChains(driver).move_to_element(last_card).perform()
 
-        time.sleep(pause_time)
+        metrics.pause(STAGE, pause_time)
 
-def main():
-    driver = None
-    all_products = []
+def load_all_with_observer(driver):
+    """
+    Scroll the archive list, moving on as soon as each batch of cards arrives.
 
-    try:
-        driver = build_driver()
-        print("Driver launched. Opening Product Hunt...")
-        driver.get(START_URL)
-        time.sleep(2)
+    Returns a list of {"batch", "new_cards", "seconds"} dicts, one per batch.
+    """
+    count = driver.execute_script(INSTALL_LOADER_JS)
+    driver.set_script_timeout(BATCH_TIMEOUT_MAX + 10)
+    batches = []
+    timeout = BATCH_TIMEOUT_MIN
 
-        try:
-            launches = wait_for_element_clickable(
-                driver, (By.XPATH, "//a[contains(normalize-space(.),'Launches')]"), timeout=WAIT_VERY_LONG
-            )
-            print("Found 'Launches' link — clicking it now.")
-            launches.click()
-        except TimeoutException:
-            raise RuntimeError("Could not find 'Launches' link — possibly blocked by verification.")
-        time.sleep(2)
+    while True:
+        started = time.monotonic()
+        result = driver.execute_async_script(
+            WAIT_FOR_BATCH_JS, count, timeout * 1000, BATCH_SETTLE_MS, REQUEST_GRACE_MS
+        )
+        elapsed = time.monotonic() - started
+        metrics.observe(STAGE, "wait", elapsed)
 
+        if result["count"] <= count:
+            reason = "end of list" if result["reason"] == "end" else f"no new cards after {timeout:.1f}s"
+            print(f"  Stopped scrolling: {reason}.")
+            break
+
+        batches.append({"batch": len(batches) + 1, "new_cards": result["count"] - count, "seconds": round(elapsed, 2)})
+        print(f"  Batch {len(batches)}: +{result['count'] - count} cards in {elapsed:.2f}s (total {result['count']})")
+        count = result["count"]
+
+        # Give slow batches more room, but never wait less than the minimum
+        average = sum(b["seconds"] for b in batches) / len(batches)
+        timeout = min(BATCH_TIMEOUT_MAX, max(BATCH_TIMEOUT_MIN, 3 * average))
+
+    total = sum(b["seconds"] for b in batches)
+    print(f"Loaded {len(batches)} batches ({count} cards) in {total:.1f}s.")
+    return batches
+
+def extract_cards(driver):
+    """Extract every product card in a single WebDriver round trip."""
+    with metrics.timed(STAGE, "extract"):
+        return driver.execute_script(EXTRACT_CARDS_JS)
+
+def save_captures(path, responses):
+    """Append captured (url, body) responses to a JSONL file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for url, body in responses:
+            f.write(json.dumps({"url": url, "body": body}, ensure_ascii=False) + "\n")
+
+def bare_url(url):
+    """url without query, fragment or trailing slash, as HARVEST_CARDS_JS compares card links."""
+    return url.split("#")[0].split("?")[0].rstrip("/")
+
+def captured_cards(driver, include_page=False, capture_path=None):
+    """
+    Cards decoded from the API responses captured since the last call.
+
+    include_page also decodes the state embedded in the page itself (the
+    server-rendered first batch). Responses and page state can hold posts that
+    are not in the list (sidebars, trending), so a card only counts once a
+    rendered card links to it.
+    """
+    responses = driver_factory.take_captured(driver)
+    if capture_path and responses:
+        save_captures(capture_path, responses)
+    bodies = [body for _, body in responses]
+    if include_page:
+        bodies += find_state_blobs(driver.page_source)
+    return [card for card in decode_responses(bodies) if card["URL"]]
+
+def stream_cards(driver, detach=HARVEST_DETACH):
+    """
+    Yield product cards from the open archive list as each scroll batch arrives.
+
+    Each step harvests only the cards added since the previous one and then
+    hides (or empties) them in the page, so rendering cost and the cost of
+    each step stay flat however long the list gets.
+
+    On a capture-mode driver each batch is decoded from the JSON the page
+    fetched it with, and the rendered cards are only read when the responses
+    did not cover the whole batch. Decoded posts that no rendered card links
+    to are never yielded.
+    """
+    count = driver.execute_script(INSTALL_LOADER_JS)
+    driver.set_script_timeout(BATCH_TIMEOUT_MAX + 10)
+    timeout = BATCH_TIMEOUT_MIN
+    batch_seconds = []
+    capture = getattr(driver, "capture", False)
+    capture_path = None
+    if capture and CAPTURE_DIR:
+        capture_path = os.path.join(CAPTURE_DIR, f"{STAGE}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl")
+    decoded = {}  # bare URL -> decoded card no rendered card has linked to yet
+
+    while True:
+        started = time.monotonic()
+        if capture:
+            for card in captured_cards(driver, not batch_seconds, capture_path):
+                decoded.setdefault(bare_url(card["URL"]), card)
+        harvest = driver.execute_script(HARVEST_CARDS_JS, detach, list(decoded) if capture else None, HARVEST_STATS)
+        # Rendered cards are only read back when the API responses fell short
+        from_api = capture and not harvest["cards"]
+        if from_api:
+            cards = [decoded.pop(href) for href in dict.fromkeys(harvest["hrefs"]) if href in decoded]
+        else:
+            cards = harvest["cards"]
+            for card in cards:
+                decoded.pop(bare_url(card["URL"]), None)
+        harvest_seconds = time.monotonic() - started
+        metrics.observe(STAGE, "extract", harvest_seconds)
+        metrics.count(STAGE, "success", len(cards))
+        if capture:
+            metrics.count(STAGE, "captured" if from_api else "dom_fallback", len(cards))
+        stats = ""
+        if HARVEST_STATS:
+            stats = f" (JS heap {driver_factory.js_heap_bytes(driver) / 1e6:.1f} MB, {harvest['domNodes']} DOM nodes)"
+        print(f"  Harvested {len(cards)} cards{' from API responses' if from_api else ''} in {1000 * harvest_seconds:.0f} ms{stats}")
+        yield from cards
+
+        started = time.monotonic()
+        result = driver.execute_async_script(
+            WAIT_FOR_BATCH_JS, count, timeout * 1000, BATCH_SETTLE_MS, REQUEST_GRACE_MS
+        )
+        waited = time.monotonic() - started
+        metrics.observe(STAGE, "wait", waited)
+        if result["count"] <= count:
+            break
+        count = result["count"]
+        batch_seconds.append(waited)
+        timeout = min(BATCH_TIMEOUT_MAX, max(BATCH_TIMEOUT_MIN, 3 * sum(batch_seconds) / len(batch_seconds)))
+
+    print(f"Archive stream finished: {len(batch_seconds)} batches, {count} cards.")
+
+def harvest_to_csv(driver, path, columns=None):
+    """Stream every card of the open archive list straight into a CSV file; returns the row count."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns or (CAPTURE_COLUMNS if getattr(driver, "capture", False) else SHARD_COLUMNS))
+        writer.writeheader()
+        for product in stream_cards(driver):
+            writer.writerow(product)
+            count += 1
+            print(f"{count}. {product['Title']} | Votes: {product['Votes']} | Tags: {product['Tags']}")
+            if count % 20 == 0:
+                f.flush()
+    return count
+
+def extract_cards_dom(product_cards):
+    all_products = []
+    for card in product_cards:
         try:
-            archive_elem = wait_for_element_clickable(
-                driver,
-                (By.XPATH, "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), 'archive') and (contains(., 'Launch') or contains(., 'launch'))]"),
-                timeout=10
-            )
-            print("Found 'Launch Archive' — clicking.")
-            archive_elem.click()
-            time.sleep(3)
-        except TimeoutException:
-            print("No explicit 'Launch Archive' link found — using current page.")
+            try:
+                card.find_element(By.CSS_SELECTOR, "button[data-test='vote-button']")
+            except:
+                continue
 
-        all_url = driver.find_element(By.XPATH, "//a[contains(@href, '/all')]").get_attribute("href")
-        driver.get(all_url)
-        print(f"Navigated directly to ALL tab URL: {all_url}")
-        time.sleep(3)
+            name_elem = card.find_element(By.CSS_SELECTOR, "div[data-test^='post-name-'] a")
+            product_name = name_elem.text.strip()
+            product_url = name_elem.get_attribute("href")
 
-        print("Scrolling to load all products...")
-        scroll_to_load_all(driver)
-        print("✅ 'All' tab fully loaded with new product cards.")
+            try:
+                description = card.find_element(By.CSS_SELECTOR, "div.text-16.font-normal").text.strip()
+            except:
+                description = ""
 
-        product_cards = wait_for_elements_present(
-            driver, (By.CSS_SELECTOR, "section[data-test^='post-item-']"), timeout=WAIT_VERY_LONG
-        )
-        print(f"Found {len(product_cards)} product cards (including promoted).")
+            try:
+                tags = [t.text.strip() for t in card.find_elements(By.CSS_SELECTOR, "div[data-sentry-component='TagList'] a")]
+            except:
+                tags = []
 
-        for card in product_cards:
             try:
-                try:
-                    card.find_element(By.CSS_SELECTOR, "button[data-test='vote-button']")
-                except:
-                    continue
-
-                name_elem = card.find_element(By.CSS_SELECTOR, "div[data-test^='post-name-'] a")
-                product_name = name_elem.text.strip()
-                product_url = name_elem.get_attribute("href")
-
-                try:
-                    description = card.find_element(By.CSS_SELECTOR, "div.text-16.font-normal").text.strip()
-                except:
-                    description = ""
-
-                try:
-                    tags = [t.text.strip() for t in card.find_elements(By.CSS_SELECTOR, "div[data-sentry-component='TagList'] a")]
-                except:
-                    tags = []
-
-                try:
-                    votes = card.find_element(By.CSS_SELECTOR, "button[data-test='vote-button'] p").text.strip()
-                except:
-                    votes = "0"
-
-                all_products.append({
-                    "Title": product_name,
-                    "URL": product_url,
-                    "Description": description,
-                    "Tags": ", ".join(tags),
-                    "Votes": votes
-                })
-
-                print(f"{len(all_products)}. {product_name} | Votes: {votes} | Tags: {tags}")
-
-            except StaleElementReferenceException:
-                continue
-            except Exception as e:
-                print("Error extracting card:", e)
+                votes = card.find_element(By.CSS_SELECTOR, "button[data-test='vote-button'] p").text.strip()
+            except:
+                votes = "0"
+
+            all_products.append({
+                "Title": product_name,
+                "URL": product_url,
+                "Description": description,
+                "Tags": ", ".join(tags),
+                "Votes": votes
+            })
+
+            print(f"{len(all_products)}. {product_name} | Votes: {votes} | Tags: {tags}")
+
+        except StaleElementReferenceException:
+            metrics.count(STAGE, "stale")
+            continue
+        except Exception as e:
+            metrics.count(STAGE, "error")
+            print("Error extracting card:", e)
+
+    return all_products
+
+def open_all_tab(driver):
+    """Click through Launches → Launch Archive and open its ALL tab; returns the tab URL."""
+    load_page(driver, START_URL)
+    metrics.pause(STAGE, 2)
+
+    try:
+        launches = wait_for_element_clickable(
+            driver, (By.XPATH, "//a[contains(normalize-space(.),'Launches')]"), timeout=WAIT_VERY_LONG
+        )
+        print("Found 'Launches' link — clicking it now.")
+        launches.click()
+    except TimeoutException:
+        raise RuntimeError("Could not find 'Launches' link — possibly blocked by verification.")
+    metrics.pause(STAGE, 2)
+
+    try:
+        archive_elem = wait_for_element_clickable(
+            driver,
+            (By.XPATH, "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), 'archive') and (contains(., 'Launch') or contains(., 'launch'))]"),
+            timeout=10
+        )
+        print("Found 'Launch Archive' — clicking.")
+        archive_elem.click()
+        metrics.pause(STAGE, 3)
+    except TimeoutException:
+        print("No explicit 'Launch Archive' link found — using current page.")
+
+    all_url = driver.find_element(By.XPATH, "//a[contains(@href, '/all')]").get_attribute("href")
+    load_page(driver, all_url)
+    print(f"Navigated directly to ALL tab URL: {all_url}")
+    metrics.pause(STAGE, 3)
+    return all_url
+
+def scrape_open_list(driver, page_url):
+    """Scroll the open archive list until every card has loaded, then extract all cards."""
+    print("Scrolling to load all products...")
+    if SCROLL_MODE == "observer":
+        load_all_with_observer(driver)
+    else:
+        scroll_to_load_all(driver)
+    print("✅ 'All' tab fully loaded with new product cards.")
+
+    product_cards = wait_for_elements_present(
+        driver, (By.CSS_SELECTOR, "section[data-test^='post-item-']"), timeout=WAIT_VERY_LONG
+    )
+    print(f"Found {len(product_cards)} product cards (including promoted).")
+
+    if SNAPSHOT_MODE or BULK_EXTRACT:
+        if SNAPSHOT_MODE:
+            html = driver.page_source
+            print(f"Saved page snapshot: {save_snapshot('archive', page_url, html)}")
+            with metrics.timed(STAGE, "extract"):
+                all_products = parse_archive_cards(html)
+        else:
+            all_products = extract_cards(driver)
+        for n, product in enumerate(all_products, start=1):
+            print(f"{n}. {product['Title']} | Votes: {product['Votes']} | Tags: {product['Tags']}")
+    else:
+        with metrics.timed(STAGE, "extract"):
+            all_products = extract_cards_dom(product_cards)
+    metrics.count(STAGE, "success", len(all_products))
+    return all_products
+
+# === DATE-RANGE CRAWL ===
+def daily_archive_url(day):
+    return DAILY_ARCHIVE_URL.format(year=day.year, month=day.month, day=day.day)
+
+def shard_path(day):
+    return os.path.join(SHARD_DIR, f"{day.isoformat()}.csv")
+
+def day_end(day):
+    """When a launch day ends in Pacific time, as a UTC datetime."""
+    # Fixed UTC-8 offset: errs on the side of re-crawling during daylight saving
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(days=1, hours=8)
+
+def is_final(day):
+    """
+    A launch day's results stop changing once that day has ended in Pacific time,
+    so its shard is final only if it was written after that. A shard written
+    while the day was still running (a daily top-up) is crawled again.
+    """
+    path = shard_path(day)
+    if not os.path.exists(path):
+        return False
+    written = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+    return written >= day_end(day)
+
+def days_to_crawl(start, end, force=False):
+    days = []
+    day = start
+    while day <= end:
+        if force or not is_final(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def crawl_day(driver, day):
+    """Scrape one day's archive into its shard; returns the number of products."""
+    page_url = daily_archive_url(day)
+    print(f"[{day}] Opening {page_url}")
+    load_page(driver, page_url)
+    metrics.pause(STAGE, 3)
+
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    tmp_path = shard_path(day) + ".tmp"
+    if INCREMENTAL_HARVEST and not SNAPSHOT_MODE:
+        count = harvest_to_csv(driver, tmp_path)
+        if count == 0:
+            metrics.count(STAGE, "empty")
+            raise RuntimeError(f"No product cards found for {day}")
+    else:
+        # Every launch day has products; no cards means a block or a broken page,
+        # so the TimeoutException leaves the day without a shard to retry later
+        all_products = scrape_open_list(driver, page_url)
+        pd.DataFrame(all_products, columns=SHARD_COLUMNS).to_csv(tmp_path, index=False)
+        count = len(all_products)
+
+    # Only a fully written shard ever appears under its final name
+    os.replace(tmp_path, shard_path(day))
+    print(f"[{day}] Saved {count} products to '{shard_path(day)}'.")
+    return count
+
+def merge_shards(start, end):
+    """Concatenate the shards for start..end (with a Date column) into OUTPUT_CSV."""
+    frames = []
+    day = start
+    while day <= end:
+        if os.path.exists(shard_path(day)):
+            df = pd.read_csv(shard_path(day))
+            df.insert(0, "Date", day.isoformat())
+            frames.append(df)
+        day += timedelta(days=1)
+    if not frames:
+        print("No shards to merge.")
+        return
+    merged = pd.concat(frames, ignore_index=True)
+    merged.to_csv(OUTPUT_CSV, index=False)
+    print(f"Merged {len(frames)} day shards ({len(merged)} products) into '{OUTPUT_CSV}'.")
+
+def crawl_range(start, end, workers=DAY_WORKERS, force=False):
+    days = days_to_crawl(start, end, force)
+    total_days = (end - start).days + 1
+    print(f"{total_days} days in range, {total_days - len(days)} already complete, {len(days)} to crawl.")
+    counts = run_pool(days, crawl_day, build_driver, workers=workers, user_data_dir=USER_DATA_DIR)
+    failed = [day for day, count in zip(days, counts) if count is None]
+    if failed:
+        print(f"⚠️ {len(failed)} days failed and will be retried next run: {', '.join(map(str, failed))}")
+    merge_shards(start, end)
+    metrics.write_reports(STAGE)
+
+def main():
+    driver = None
+    all_products = []
 
-        df = pd.DataFrame(all_products)
-        df.to_csv(OUTPUT_CSV, index=False)
-        print(f"\nScraping complete. Saved {len(all_products)} products to '{OUTPUT_CSV}'.")
+    try:
+        driver = build_driver()
+        print("Driver launched. Opening Product Hunt...")
+        all_url = open_all_tab(driver)
+        if INCREMENTAL_HARVEST and not SNAPSHOT_MODE:
+            count = harvest_to_csv(driver, OUTPUT_CSV)
+            print(f"\nScraping complete. Saved {count} products to '{OUTPUT_CSV}'.")
+        else:
+            all_products = scrape_open_list(driver, all_url)
+            df = pd.DataFrame(all_products)
+            df.to_csv(OUTPUT_CSV, index=False)
+            print(f"\nScraping complete. Saved {len(all_products)} products to '{OUTPUT_CSV}'.")
 
     except Exception as exc:
         print("ERROR:", exc)
         traceback.print_exc()
 
     finally:
+        metrics.write_reports(STAGE)
         if driver:
             # driver.quit()  # Uncomment to auto-close browser
             print("Driver still running (close manually).")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape the Product Hunt launch archive.")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat,
+                        help="first day to crawl (YYYY-MM-DD); without it, scrape the current archive page")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last day to crawl (default: --from)")
+    parser.add_argument("--workers", type=int, default=DAY_WORKERS, help="days crawled in parallel")
+    parser.add_argument("--force", action="store_true", help="re-crawl days that already have a complete shard")
+    args = parser.parse_args()
+
+    if args.start:
+        crawl_range(args.start, args.end or args.start, workers=args.workers, force=args.force)
+    else:
+        main()
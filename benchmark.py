@@ -0,0 +1,679 @@
+"""
+benchmark.py
+Offline benchmark of the three scraping stages against a local fixture server.
+
+The server generates archive, product/Team and profile pages with the same
+data-test / data-sentry-component markup the scrapers target. The archive list
+is infinite-scrolled from a JSON API, like the real site, whose responses also
+carry GraphQL-style Post nodes for archive_scraper's CAPTURE_MODE. Each stage is run
+end to end with its module's current settings in a single browser, and the
+benchmark reports:
+- pages/sec (HTML pages served by the fixture server)
+- records/sec
+- WebDriver round trips per record (every driver.execute call)
+- peak browser JS heap and peak Python memory
+
+The http stage needs no browser either: it runs profile_scraper.fetch_profiles
+with FETCH_BACKEND = "http" against the fixture server, and checks that a 404
+and a verification page come back as None, to be left for the browser.
+
+The store stage needs no browser: it writes the product and profile results
+to a scratch result_store and times the wide CSV export, with some products
+listed twice (as after merge_shards) next to Date and Makers columns.
+
+Results are saved as JSON under bench_results/ so runs can be compared:
+
+    python benchmark.py --label baseline
+    python benchmark.py --set product_scraper.BULK_EXTRACT=False --label per-element
+    python benchmark.py --set archive_scraper.CAPTURE_MODE=True --label capture
+    python benchmark.py --set product_scraper.TABS=1 --label one-tab
+    python benchmark.py compare             # last two runs
+    python benchmark.py compare a.json b.json
+"""
+
+import argparse
+import ast
+import glob
+import html
+import importlib
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import archive_scraper
+import driver_factory
+import http_fetcher
+import metrics
+import product_scraper
+import profile_scraper
+from driver_factory import load_page
+from link_engine import classify_links
+from result_store import ResultStore
+from selenium.common.exceptions import WebDriverException
+
+# === CONFIG ===
+RESULTS_DIR = "bench_results"
+HEADLESS = True  # fixture pages do not need a visible window
+CARDS_PER_DAY = 200  # cards in each day's archive list
+PAGE_SIZE = 20  # cards per server-rendered page / infinite-scroll batch
+ARCHIVE_DAYS = 1  # days crawled by the archive stage
+PRODUCTS = 10  # product pages scraped by the product stage
+MAKERS_PER_PRODUCT = 6
+PROFILES = 10  # profiles scraped by the profile stage
+LINKS_PER_PROFILE = 6
+STORE_PRODUCTS = 2000  # products written and exported by the store stage
+STORE_DUPLICATE_EVERY = 10  # every Nth product is listed twice in the export
+API_DELAY_MS = 200  # latency of each infinite-scroll request
+FIRST_DAY = date(2024, 1, 1)
+
+MAKER_ROLES = ["Founder", "Software Engineer", "CEO", "Designer", "Marketing", "Community", "CTO", "Sales"]
+# Profile links cycle through these; each lands in a different SOCIAL_PLATFORMS column
+PROFILE_LINKS = [
+    "https://www.linkedin.com/in/{user}",
+    "https://twitter.com/{user}",
+    "https://github.com/{user}",
+    "https://www.youtube.com/@{user}",
+    "https://www.instagram.com/{user}",
+    "https://medium.com/@{user}",
+    "https://www.facebook.com/{user}",
+    "https://t.me/{user}",
+    "https://{user}.dev",
+]
+
+
+# === FIXTURE DATA ===
+def card_data(index):
+    return {
+        "id": index,
+        "slug": f"product-{index}",
+        "name": f"Product {index}",
+        "tagline": f"Tagline of product {index}, for benchmarking",
+        "topics": [f"Topic {index % 7}", f"Topic {index % 11}"],
+        "votes": 1000 - index % 1000,
+    }
+
+def product_website(index):
+    return f"https://product-{index}.example.com"
+
+def maker_username(index, n):
+    return f"maker-{index}-{n}"
+
+def profile_links(username):
+    return [PROFILE_LINKS[n % len(PROFILE_LINKS)].format(user=username) for n in range(LINKS_PER_PROFILE)]
+
+def day_offset(day):
+    """Index of the first card of day; each day has its own products."""
+    return (day - FIRST_DAY).days * CARDS_PER_DAY
+
+
+# === FIXTURE PAGES ===
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+</head><body>
+{body}
+{state}
+</body></html>
+"""
+
+# The archive list: PAGE_SIZE cards server-rendered, the rest fetched from
+# /api/cards whenever the sentinel below the list scrolls into view
+ARCHIVE_SCRIPT = """
+<script>
+const list = document.getElementById("posts");
+const sentinel = document.getElementById("sentinel");
+let offset = %(offset)d, end = %(end)d, loading = false;
+async function loadMore() {
+    if (loading || offset >= end) return;
+    loading = true;
+    const response = await fetch("/api/cards?offset=" + offset + "&end=" + end);
+    const cards = (await response.json()).cards;
+    list.insertAdjacentHTML("beforeend", cards.join(""));
+    offset += cards.length;
+    loading = false;
+    if (!cards.length) offset = end;
+    // Still at the bottom (short batch, or harvested cards hidden): keep going
+    if (sentinel.getBoundingClientRect().top < window.innerHeight + 800) loadMore();
+}
+new IntersectionObserver(entries => {
+    if (entries.some(e => e.isIntersecting)) loadMore();
+}, {rootMargin: "800px"}).observe(sentinel);
+</script>
+"""
+
+def render_card(index):
+    card = card_data(index)
+    tags = "".join(f'<a href="/topics/{i}">{html.escape(t)}</a>' for i, t in enumerate(card["topics"]))
+    return (
+        f'<section data-test="post-item-{index}" class="flex flex-row gap-4">'
+        f'<div data-test="post-name-{index}" class="text-16 font-semibold">'
+        f'<a href="/products/{card["slug"]}">{html.escape(card["name"])}</a></div>'
+        f'<div class="text-16 font-normal">{html.escape(card["tagline"])}</div>'
+        f'<div data-sentry-component="TagList">{tags}</div>'
+        f'<button data-test="vote-button"><p>{card["votes"]}</p></button>'
+        f"</section>"
+    )
+
+def post_node(index, base_url):
+    """A card as the GraphQL Post node the list API sends alongside its markup."""
+    card = card_data(index)
+    return {
+        "__typename": "Post", "id": str(index), "slug": card["slug"], "name": card["name"],
+        "url": f"{base_url}/products/{card['slug']}", "tagline": card["tagline"], "votesCount": card["votes"],
+        "topics": {"edges": [{"node": {"__typename": "Topic", "name": t}} for t in card["topics"]]},
+        "makers": [
+            {"__typename": "User", "name": f"Maker {index}-{n}", "url": f"{base_url}/@{maker_username(index, n)}"}
+            for n in range(MAKERS_PER_PRODUCT)
+        ],
+    }
+
+def render_archive(day):
+    start = day_offset(day)
+    end = start + CARDS_PER_DAY
+    cards = "".join(render_card(i) for i in range(start, min(end, start + PAGE_SIZE)))
+    body = (
+        f'<main><div id="posts">{cards}</div><div id="sentinel"></div></main>'
+        + ARCHIVE_SCRIPT % {"offset": min(end, start + PAGE_SIZE), "end": end}
+    )
+    return PAGE_TEMPLATE.format(title=f"Launches on {day}", body=body, state="")
+
+def embedded_state_script(entities):
+    data = {"props": {"pageProps": {}, "apolloState": entities}}
+    return f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+
+def product_state(index, base_url):
+    card = card_data(index)
+    entities = {}
+    makers = []
+    for n in range(MAKERS_PER_PRODUCT):
+        key = f"User:{index}-{n}"
+        # Full URL instead of a username, so the scrapers stay on the fixture server
+        entities[key] = {"__typename": "User", "name": f"Maker {index}-{n}",
+                         "url": f"{base_url}/@{maker_username(index, n)}"}
+        makers.append({"role": MAKER_ROLES[n % len(MAKER_ROLES)], "user": {"__ref": key}})
+    entities[f"Post:{index}"] = {"__typename": "Post", "slug": card["slug"], "name": card["name"],
+                                 "websiteUrl": product_website(index), "makers": makers}
+    return embedded_state_script(entities)
+
+def render_product(index, team, embedded, base_url):
+    card = card_data(index)
+    nav = f'<nav><a data-test="product-navigation-item-team" href="/products/{card["slug"]}/makers">Team</a></nav>'
+    if team:
+        body = nav + "".join(
+            f'<section data-test="maker-card-{n}">'
+            f'<a class="text-16 font-semibold" href="/@{maker_username(index, n)}">Maker {index}-{n}</a>'
+            f'<a class="text-14 font-normal" href="/@{maker_username(index, n)}">{MAKER_ROLES[n % len(MAKER_ROLES)]}</a>'
+            f"</section>"
+            for n in range(MAKERS_PER_PRODUCT)
+        )
+    else:
+        website = product_website(index)
+        body = (
+            f'<h1>{html.escape(card["name"])}</h1>{nav}'
+            f'<div data-sentry-component="Status"><div class="text-lg font-semibold">Company Info</div>'
+            f'<a href="{website}">{website[8:]}</a></div>'
+        )
+    state = product_state(index, base_url) if embedded else ""
+    return PAGE_TEMPLATE.format(title=card["name"], body=body, state=state)
+
+def render_profile(username, embedded):
+    links = profile_links(username)
+    anchors = "".join(f'<a href="{href}">{html.escape(href)}</a>' for href in links)
+    body = f"<h1>{username}</h1><a href='/'>Home</a><h2>Links</h2><div>{anchors}</div>"
+    state = ""
+    if embedded:
+        state = embedded_state_script({f"User:{username}": {
+            "__typename": "User", "username": username, "links": [{"url": href} for href in links]
+        }})
+    return PAGE_TEMPLATE.format(title=username, body=body, state=state)
+
+
+# === FIXTURE SERVER ===
+ARCHIVE_RE = re.compile(r"^/leaderboard/daily/(\d+)/(\d+)/(\d+)/all$")
+PRODUCT_RE = re.compile(r"^/products/product-(\d+)(/makers)?$")
+PROFILE_RE = re.compile(r"^/@([\w-]+)$")
+CHALLENGE_PATH = "/challenge"  # a verification page, served with status 200 like the real one
+CHALLENGE_PAGE = "<html><head><title>Just a moment...</title></head><body><div id='cf-challenge'></div></body></html>"
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, embedded_state=False):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.embedded_state = embedded_state
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.hits = Counter()
+        self.lock = threading.Lock()
+
+    def count(self, kind):
+        with self.lock:
+            self.hits[kind] += 1
+
+    def reset(self):
+        with self.lock:
+            hits = dict(self.hits)
+            self.hits.clear()
+        return hits
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, body, content_type="text/html; charset=utf-8", status=200):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path
+        server = self.server
+
+        if path == "/api/cards":
+            query = parse_qs(parts.query)
+            offset, end = int(query["offset"][0]), int(query["end"][0])
+            time.sleep(API_DELAY_MS / 1000)
+            server.count("api")
+            indexes = range(offset, min(end, offset + PAGE_SIZE))
+            data = {"posts": {"edges": [{"node": post_node(i, server.base_url)} for i in indexes]}}
+            return self.send(json.dumps({"data": data, "cards": [render_card(i) for i in indexes]}), "application/json")
+
+        match = ARCHIVE_RE.match(path)
+        if match:
+            server.count("archive")
+            return self.send(render_archive(date(*map(int, match.groups()))))
+        match = PRODUCT_RE.match(path)
+        if match:
+            server.count("team" if match.group(2) else "product")
+            return self.send(render_product(int(match.group(1)), bool(match.group(2)), server.embedded_state, server.base_url))
+        match = PROFILE_RE.match(path)
+        if match:
+            server.count("profile")
+            return self.send(render_profile(match.group(1), server.embedded_state))
+        if path == CHALLENGE_PATH:
+            server.count("challenge")
+            return self.send(CHALLENGE_PAGE)
+
+        server.count("other")
+        self.send("<html><body>Not found</body></html>", status=404)
+
+
+def start_server(embedded_state=False):
+    server = FixtureServer(embedded_state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# === MEASUREMENT ===
+class DriverProbe:
+    """Counts WebDriver round trips by wrapping driver.execute; samples the page's JS heap."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.commands = Counter()
+        self.peak_heap = 0
+        self.sampling_seconds = 0.0
+        self.paused = False
+        execute = driver.execute
+
+        def counting_execute(driver_command, params=None):
+            if not self.paused:
+                self.commands[driver_command] += 1
+            return execute(driver_command, params)
+
+        # WebElement calls go through their parent driver's execute too
+        driver.execute = counting_execute
+
+    def sample(self):
+        """Record the JS heap size; neither the call nor its time count toward the stage."""
+        started = time.monotonic()
+        self.paused = True
+        try:
+            self.peak_heap = max(self.peak_heap, driver_factory.js_heap_bytes(self.driver))
+        finally:
+            self.paused = False
+            self.sampling_seconds += time.monotonic() - started
+
+
+def build_driver(module):
+    return driver_factory.build_driver(
+        None, lean=module.LEAN_MODE, headless=HEADLESS, eager=module.EAGER_LOAD, stage=module.STAGE,
+        capture=getattr(module, "CAPTURE_MODE", False), background_tabs=getattr(module, "TABS", 1) > 1,
+    )
+
+def run_stage(name, module, server, items, work):
+    """
+    Run work(driver, item) -> ok for every item in one fresh browser; returns the stage's metrics.
+
+    The driver is launched before the clock starts, so browser startup is not measured.
+    """
+    print(f"\n=== {name}: {len(items)} items ===")
+    driver = build_driver(module)
+    probe = DriverProbe(driver)
+    try:
+        load_page(driver, server.base_url + "/")  # warm up the connection and the renderer
+        probe.commands.clear()
+        server.reset()
+
+        tracemalloc.start()
+        records = ok = 0
+        started = time.monotonic()
+        for item in items:
+            result_records, result_ok = work(driver, item)
+            records += result_records
+            ok += result_ok
+            probe.sample()
+        seconds = time.monotonic() - started - probe.sampling_seconds
+        python_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        driver.quit()
+
+    hits = server.reset()
+    pages = sum(count for kind, count in hits.items() if kind not in ("api", "other"))
+    round_trips = sum(probe.commands.values())
+    stage_metrics = {
+        "items": len(items),
+        "records": records,
+        "ok": ok,
+        "seconds": round(seconds, 2),
+        "pages": pages,
+        "pages_per_sec": round(pages / seconds, 3) if seconds else 0,
+        "records_per_sec": round(records / seconds, 3) if seconds else 0,
+        "round_trips": round_trips,
+        "round_trips_per_record": round(round_trips / records, 2) if records else None,
+        "browser_heap_peak_mb": round(probe.peak_heap / 1e6, 1),
+        "python_peak_mb": round(python_peak / 1e6, 1),
+        "server_hits": hits,
+        "top_commands": dict(probe.commands.most_common(8)),
+    }
+    print(
+        f"{name}: {records} records ({ok} correct) in {stage_metrics['seconds']}s — "
+        f"{stage_metrics['pages_per_sec']} pages/s, {stage_metrics['round_trips_per_record']} round trips/record, "
+        f"browser heap {stage_metrics['browser_heap_peak_mb']} MB, Python {stage_metrics['python_peak_mb']} MB"
+    )
+    return stage_metrics
+
+
+# === STAGES ===
+def bench_archive(server):
+    archive_scraper.DAILY_ARCHIVE_URL = server.base_url + "/leaderboard/daily/{year}/{month}/{day}/all"
+    days = [FIRST_DAY + timedelta(days=n) for n in range(ARCHIVE_DAYS)]
+
+    def work(driver, day):
+        count = archive_scraper.crawl_day(driver, day)
+        return count, int(count == CARDS_PER_DAY)
+
+    # Shards go to a scratch directory, not the real archive_shards/
+    with tempfile.TemporaryDirectory() as shard_dir:
+        archive_scraper.SHARD_DIR = shard_dir
+        return run_stage("archive", archive_scraper, server, days, work)
+
+def bench_products(server):
+    rows = [(card_data(i)["name"], f"{server.base_url}/products/{card_data(i)['slug']}") for i in range(PRODUCTS)]
+
+    def correct(row, result):
+        index = int(row[1].rsplit("-", 1)[1])
+        return bool(result) and result["Website"] == product_website(index) and "Maker1_Link" in result
+
+    if product_scraper.TABS > 1:
+        # Tab mode scrapes a batch per call, like scrape_products() does
+        batches = [rows[n:n + product_scraper.TAB_BATCH] for n in range(0, len(rows), product_scraper.TAB_BATCH)]
+
+        def work_batch(driver, batch):
+            results = product_scraper.scrape_products_in_tabs(driver, batch)
+            return len(batch), sum(correct(row, result) for row, result in zip(batch, results))
+
+        return run_stage("product", product_scraper, server, batches, work_batch)
+
+    def work(driver, row):
+        try:
+            result = product_scraper.scrape_product(driver, row)
+        except WebDriverException:
+            return 1, 0
+        return 1, int(correct(row, result))
+
+    return run_stage("product", product_scraper, server, rows, work)
+
+def bench_profiles(server):
+    usernames = [maker_username(i // MAKERS_PER_PRODUCT, i % MAKERS_PER_PRODUCT) for i in range(PROFILES)]
+    expected = min(LINKS_PER_PROFILE, len(PROFILE_LINKS))
+
+    def work(driver, username):
+        try:
+            links = profile_scraper.extract_links_from_section(driver, f"{server.base_url}/@{username}")
+        except WebDriverException:
+            return 1, 0
+        return 1, int(len(links) == expected)
+
+    return run_stage("profile", profile_scraper, server, usernames, work)
+
+def bench_http(server):
+    """profile_scraper.fetch_profiles over plain HTTP; a 404 and a verification page must come back as None."""
+    usernames = [maker_username(i // MAKERS_PER_PRODUCT, i % MAKERS_PER_PRODUCT) for i in range(PROFILES)]
+    urls = [f"{server.base_url}/@{username}" for username in usernames]
+    blocked = [f"{server.base_url}/missing/@nobody", server.base_url + CHALLENGE_PATH]
+    print(f"\n=== http: {len(urls)} profiles, {len(blocked)} blocked pages ===")
+    server.reset()
+
+    backend = profile_scraper.FETCH_BACKEND
+    profile_scraper.FETCH_BACKEND = "http"
+    try:
+        tracemalloc.start()
+        started = time.monotonic()
+        # All good profiles resolve over HTTP, so fetch_profiles never reaches its browser fallback
+        links_by_url = profile_scraper.fetch_profiles(urls)
+        left_for_browser = http_fetcher.fetch_pages(blocked)
+        seconds = time.monotonic() - started
+        python_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        profile_scraper.FETCH_BACKEND = backend
+
+    hits = server.reset()
+    expected = min(LINKS_PER_PROFILE, len(PROFILE_LINKS))
+    ok = sum(len(links_by_url.get(url) or {}) == expected for url in urls)
+    ok += sum(page is None for page in left_for_browser)
+    http_metrics = {
+        "items": len(urls) + len(blocked),
+        "records": len(links_by_url),
+        "ok": ok,
+        "seconds": round(seconds, 2),
+        "pages": hits.get("profile", 0),
+        "pages_per_sec": round(hits.get("profile", 0) / seconds, 3) if seconds else 0,
+        "records_per_sec": round(len(links_by_url) / seconds, 3) if seconds else 0,
+        "python_peak_mb": round(python_peak / 1e6, 1),
+        "server_hits": hits,
+    }
+    print(
+        f"http: {len(links_by_url)} profiles ({ok}/{http_metrics['items']} correct, blocked pages included) "
+        f"in {http_metrics['seconds']}s — {http_metrics['pages_per_sec']} pages/s"
+    )
+    return http_metrics
+
+def bench_store(server):
+    """Write STORE_PRODUCTS products to a scratch store and export them; no browser involved."""
+    print(f"\n=== store: {STORE_PRODUCTS} products ===")
+    cards, products, links = [], [], {}
+    for i in range(STORE_PRODUCTS):
+        card = card_data(i)
+        url = f"{server.base_url}/products/{card['slug']}"
+        usernames = [maker_username(i, n) for n in range(MAKERS_PER_PRODUCT)]
+        cards.append({
+            "Date": (FIRST_DAY + timedelta(days=i % 7)).isoformat(), "Title": card["name"], "URL": url,
+            "Description": card["tagline"], "Tags": ", ".join(card["topics"]), "Votes": card["votes"],
+            "Makers": ", ".join(usernames),
+        })
+        products.append(product_scraper.product_row(
+            card["name"], url, product_website(i),
+            [{"name": username, "link": f"https://www.producthunt.com/@{username}"} for username in usernames],
+        ))
+        for username in usernames:
+            links[f"https://www.producthunt.com/@{username}"] = classify_links(profile_links(username))
+    # Listing order of the export, with duplicates like a merge of overlapping shards
+    order = [card["URL"] for card in cards]
+    order += order[::STORE_DUPLICATE_EVERY]
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = ResultStore(os.path.join(store_dir, "results.sqlite"))
+        try:
+            tracemalloc.start()
+            started = time.monotonic()
+            store.put_cards(cards)
+            store.put_products(products)
+            store.put_links(links)
+            df = store.export(order, makers=True, links=True)
+            seconds = time.monotonic() - started
+            python_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            store.close()
+
+    expected = {card["URL"]: card for card in cards}
+    ok = sum(
+        row["URL"] == url and row["Makers"] == expected[url]["Makers"] and row["Website"] == product_website(int(url.rsplit("-", 1)[1]))
+        for url, (_, row) in zip(order, df.iterrows())
+    )
+    store_metrics = {
+        "items": len(order),
+        "records": len(df),
+        "ok": ok,
+        "seconds": round(seconds, 2),
+        "records_per_sec": round(len(df) / seconds, 3) if seconds else 0,
+        "python_peak_mb": round(python_peak / 1e6, 1),
+    }
+    print(f"store: {len(df)} rows ({ok} correct) in {store_metrics['seconds']}s, Python {store_metrics['python_peak_mb']} MB")
+    return store_metrics
+
+
+# === RESULTS ===
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def apply_overrides(assignments):
+    """Apply MODULE.NAME=VALUE settings (VALUE is a Python literal); returns them as a dict."""
+    applied = {}
+    for assignment in assignments:
+        target, value = assignment.split("=", 1)
+        module_name, name = target.rsplit(".", 1)
+        module = importlib.import_module(module_name)
+        if not hasattr(module, name):
+            raise SystemExit(f"Unknown setting: {target}")
+        setattr(module, name, ast.literal_eval(value))
+        applied[target] = getattr(module, name)
+    return applied
+
+def save_results(results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{results['started'].replace(':', '').replace('-', '')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+    return path
+
+COMPARED_METRICS = [
+    "seconds", "pages_per_sec", "records_per_sec", "round_trips_per_record",
+    "browser_heap_peak_mb", "python_peak_mb", "ok",
+]
+
+def compare(paths):
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))[-2:]
+    if len(paths) != 2:
+        raise SystemExit(f"Need two result files to compare (found {len(paths)} in {RESULTS_DIR}/).")
+
+    runs = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            runs.append(json.load(f))
+    old, new = runs
+    print(f"old: {paths[0]} ({old.get('label') or old.get('revision')})")
+    print(f"new: {paths[1]} ({new.get('label') or new.get('revision')})")
+
+    for stage in new["stages"]:
+        if stage not in old["stages"]:
+            continue
+        print(f"\n{stage:<24}{'old':>12}{'new':>12}{'change':>10}")
+        for metric in COMPARED_METRICS:
+            a, b = old["stages"][stage].get(metric), new["stages"][stage].get(metric)
+            change = f"{100 * (b - a) / a:+.0f}%" if a and b is not None else ""
+            print(f"  {metric:<22}{str(a):>12}{str(b):>12}{change:>10}")
+
+
+# === MAIN ===
+STAGES = {"archive": bench_archive, "product": bench_products, "profile": bench_profiles, "http": bench_http, "store": bench_store}
+
+def main(args):
+    global CARDS_PER_DAY, ARCHIVE_DAYS, PRODUCTS, MAKERS_PER_PRODUCT, PROFILES, LINKS_PER_PROFILE
+    CARDS_PER_DAY, ARCHIVE_DAYS, PRODUCTS = args.cards, args.days, args.products
+    MAKERS_PER_PRODUCT, PROFILES, LINKS_PER_PROFILE = args.makers, args.profiles, args.links
+    overrides = apply_overrides(args.set or [])
+
+    results = {
+        "started": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "label": args.label,
+        "revision": git_revision(),
+        "sizes": {
+            "cards_per_day": CARDS_PER_DAY, "page_size": PAGE_SIZE, "archive_days": ARCHIVE_DAYS,
+            "products": PRODUCTS, "makers_per_product": MAKERS_PER_PRODUCT,
+            "profiles": PROFILES, "links_per_profile": LINKS_PER_PROFILE,
+            "api_delay_ms": API_DELAY_MS, "embedded_state": args.embedded_state,
+        },
+        "overrides": overrides,
+        "stages": {},
+    }
+
+    server = start_server(embedded_state=args.embedded_state)
+    print(f"Fixture server at {server.base_url}")
+    try:
+        for stage in args.stages:
+            try:
+                results["stages"][stage] = STAGES[stage](server)
+            except Exception as exc:
+                print(f"ERROR in {stage} stage:", exc)
+                results["stages"][stage] = {"error": repr(exc)}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    results["metrics"] = metrics.REGISTRY.summary()
+    print(f"\nResults saved to '{save_results(results)}'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraping stages against a local fixture server.")
+    parser.add_argument("command", nargs="?", choices=["run", "compare"], default="run")
+    parser.add_argument("files", nargs="*", help="compare: two result files (default: the last two runs)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--cards", type=int, default=CARDS_PER_DAY, help="cards per archive day")
+    parser.add_argument("--days", type=int, default=ARCHIVE_DAYS, help="archive days to crawl")
+    parser.add_argument("--products", type=int, default=PRODUCTS, help="product pages to scrape")
+    parser.add_argument("--makers", type=int, default=MAKERS_PER_PRODUCT, help="makers per product")
+    parser.add_argument("--profiles", type=int, default=PROFILES, help="profiles to scrape")
+    parser.add_argument("--links", type=int, default=LINKS_PER_PROFILE, help="links per profile")
+    parser.add_argument("--embedded-state", action="store_true", help="include __NEXT_DATA__ state in product and profile pages")
+    parser.add_argument("--set", action="append", metavar="MODULE.NAME=VALUE",
+                        help="override a scraper setting for this run, e.g. archive_scraper.SCROLL_MODE='poll'")
+    parser.add_argument("--label", help="name stored with the results")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(args.files)
+    else:
+        main(args)
@@ -0,0 +1,54 @@
+"""
+checkpoint.py
+Append-only JSONL journal of completed records.
+
+Each record is written and fsync'ed as soon as it is done, so a crash or a
+block only loses the records that were in flight. A `--resume` run reads the
+journal back, skips the keys already in it and rebuilds its CSV from it.
+"""
+
+import json
+import os
+import threading
+
+
+class Journal:
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.lock = threading.Lock()
+        if not resume and os.path.exists(path):
+            os.remove(path)
+        self.file = open(path, "a", encoding="utf-8")
+        if self.file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a line cut short by a crash so the next record starts clean
+                    self.file.write("\n")
+
+    def records(self):
+        """{key: record} for every complete line in the journal (last write wins)."""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # line cut short by a crash
+                records[entry["key"]] = entry["record"]
+        return records
+
+    def done_keys(self):
+        return set(self.records())
+
+    def append(self, key, record):
+        line = json.dumps({"key": key, "record": record}, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,197 @@
+"""
+driver_factory.py
+Shared undetected-chromedriver factory for all three scrapers.
+
+Lean mode blocks images, fonts, media embeds and analytics/tracker hosts
+through CDP, so pages only download the HTML, scripts and API calls the
+scrapers need. Page loads done through load_page() then report how many
+bytes came over the wire and roughly how much time the blocking saved, and
+are timed as the driver's stage's `navigate` operation in metrics.py.
+
+Capture mode keeps the bodies of the site's own JSON API responses (matched
+by CAPTURE_URL_PATTERNS) as they arrive, so callers can decode records from
+them with take_captured() instead of reading the rendered page.
+"""
+
+import base64
+import json
+import os
+
+import undetected_chromedriver as uc
+from selenium.common.exceptions import WebDriverException
+
+import metrics
+
+# Resource types we never read
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8",
+    "*imgix.net*",  # Product Hunt avatars and thumbnails
+    "*youtube.com/embed*", "*player.vimeo.com*", "*loom.com/embed*",
+]
+
+# Analytics, ads and session-recording hosts
+TRACKER_HOSTS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net",
+    "segment.io", "segment.com", "sentry.io", "intercom.io", "intercomcdn.com",
+    "hotjar.com", "mixpanel.com", "amplitude.com", "clarity.ms", "fullstory.com",
+]
+
+# Chrome opens this many connections per host, so blocked requests would
+# mostly have been downloaded in parallel
+PARALLEL_CONNECTIONS = 6
+
+# Capture mode keeps JSON responses whose URL contains one of these
+CAPTURE_URL_PATTERNS = ["/frontend/graphql", "/graphql", "/api/"]
+
+
+# Chrome throttles timers and rendering in tabs that are not in front
+BACKGROUND_TAB_FLAGS = [
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
+
+def build_driver(user_data_dir=None, lean=False, headless=False, eager=False, stage=None, capture=False,
+                 background_tabs=False):
+    options = uc.ChromeOptions()
+    if user_data_dir:
+        os.makedirs(user_data_dir, exist_ok=True)
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+    options.add_argument("--start-maximized")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+
+    if eager:
+        # Return from driver.get() at DOMContentLoaded instead of the load event
+        options.page_load_strategy = "eager"
+    if background_tabs:
+        # Pages loading in background tabs (tab_pipeline.py) render at full speed
+        for flag in BACKGROUND_TAB_FLAGS:
+            options.add_argument(flag)
+    if lean:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if lean or capture:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    driver = uc.Chrome(options=options, headless=headless)
+
+    driver.lean = lean
+    driver.stage = stage  # metrics label for this driver's operations
+    driver.capture = capture
+    driver.captured = []  # (url, body) of captured responses not taken yet
+    driver.capture_pending = {}  # requestId -> url of captured responses still loading
+    if lean or capture:
+        driver.execute_cdp_cmd("Network.enable", {})
+    if lean:
+        patterns = BLOCKED_URL_PATTERNS + [f"*{host}*" for host in TRACKER_HOSTS]
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    return driver
+
+
+def read_network_log(driver):
+    """
+    Drain the performance log; returns the Network.* CDP events in it.
+
+    In capture mode the bodies of matching JSON responses are kept on the driver
+    for take_captured(), whichever caller drained the log.
+    """
+    events = []
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message["method"].startswith("Network."):
+            events.append(message)
+    if getattr(driver, "capture", False):
+        collect_responses(driver, events)
+    return events
+
+
+def is_captured_response(response):
+    mime_type = response.get("mimeType", "")
+    url = response.get("url", "")
+    return "json" in mime_type and any(pattern in url for pattern in CAPTURE_URL_PATTERNS)
+
+
+def collect_responses(driver, events):
+    """Append the body of every matching response that finished loading to driver.captured."""
+    pending = driver.capture_pending
+    for event in events:
+        params = event["params"]
+        method = event["method"]
+        if method == "Network.responseReceived" and is_captured_response(params["response"]):
+            pending[params["requestId"]] = params["response"]["url"]
+        elif method == "Network.loadingFailed":
+            pending.pop(params["requestId"], None)
+        elif method == "Network.loadingFinished" and params["requestId"] in pending:
+            url = pending.pop(params["requestId"])
+            try:
+                result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+            except WebDriverException:
+                continue  # evicted from Chrome's buffer, or the page navigated away
+            body = result["body"]
+            if result.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8", "replace")
+            driver.captured.append((url, body))
+
+
+def take_captured(driver):
+    """The (url, body) responses captured since the last call."""
+    read_network_log(driver)
+    captured, driver.captured = driver.captured, []
+    return captured
+
+
+def js_heap_bytes(driver):
+    """
+    Used JS heap of the current page, read over CDP; 0 if unavailable.
+
+    performance.memory is bucketed and refreshed only every ~20 minutes unless
+    Chrome runs with --enable-precise-memory-info, so it cannot show changes.
+    """
+    try:
+        return driver.execute_cdp_cmd("Runtime.getHeapUsage", {})["usedSize"]
+    except Exception:
+        return 0
+
+
+def summarize_network(events):
+    started = {}
+    durations = []
+    transferred = 0
+    blocked = 0
+    for event in events:
+        params = event["params"]
+        method = event["method"]
+        if method == "Network.requestWillBeSent":
+            started[params["requestId"]] = params["timestamp"]
+        elif method == "Network.loadingFinished":
+            transferred += params.get("encodedDataLength", 0)
+            if params["requestId"] in started:
+                durations.append(params["timestamp"] - started[params["requestId"]])
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+
+    average_ms = 1000 * sum(durations) / len(durations) if durations else 0
+    return {
+        "requests": len(durations),
+        "bytes": transferred,
+        "blocked": blocked,
+        # Rough estimate: blocked requests at the average request duration, spread over parallel connections
+        "est_saved_ms": round(blocked * average_ms / PARALLEL_CONNECTIONS),
+    }
+
+
+def load_page(driver, url):
+    """driver.get(url); in lean mode also prints what the page load transferred and saved."""
+    with metrics.timed(getattr(driver, "stage", None), "navigate"):
+        driver.get(url)
+    if not getattr(driver, "lean", False):
+        return None
+
+    report = summarize_network(read_network_log(driver))
+    print(
+        f"  [lean] {report['requests']} requests, {report['bytes'] / 1024:.0f} KB transferred, "
+        f"{report['blocked']} blocked (~{report['est_saved_ms']} ms saved)"
+    )
+    return report
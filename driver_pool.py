@@ -0,0 +1,111 @@
+"""
+driver_pool.py
+Run a scraping function over many URLs with a pool of isolated Chrome drivers.
+
+Each worker gets its own clone of USER_DATA_DIR (Chrome refuses to share one
+profile between running instances), pulls work from a shared queue and writes
+its result back by input index, so the output list is in the same order as
+the input list. Failed items are retried later with backoff, and every worker
+pauses while the circuit breaker is open (see retry_scheduler.py).
+"""
+
+import os
+import shutil
+import threading
+import time
+import traceback
+
+import metrics
+from retry_scheduler import MAX_ATTEMPTS, RetryScheduler
+
+# Cache folders are large and rebuilt by Chrome on demand; lock files belong
+# to the Chrome instance that is using the source profile.
+PROFILE_IGNORE = shutil.ignore_patterns(
+    "Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache",
+    "Service Worker", "Crashpad", "Singleton*", "*.lock", "lockfile",
+)
+
+# undetected_chromedriver patches the chromedriver binary on start-up, which
+# is not safe to do from several threads at once.
+_launch_lock = threading.Lock()
+
+
+def clone_profile(user_data_dir, worker_id):
+    """Return a per-worker copy of user_data_dir (created on first use)."""
+    if not user_data_dir:
+        return None
+    clone_dir = f"{user_data_dir.rstrip('/').rstrip(os.sep)}_worker{worker_id}"
+    if not os.path.isdir(clone_dir):
+        if os.path.isdir(user_data_dir):
+            shutil.copytree(user_data_dir, clone_dir, ignore=PROFILE_IGNORE)
+        else:
+            os.makedirs(clone_dir, exist_ok=True)
+    return clone_dir
+
+
+def launch_driver(build_driver, user_data_dir, worker_id):
+    profile_dir = clone_profile(user_data_dir, worker_id)
+    with _launch_lock:
+        return build_driver(user_data_dir=profile_dir)
+
+
+def run_pool(items, work_fn, build_driver, workers=1, user_data_dir=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Call work_fn(driver, item) for every item using `workers` Chrome drivers.
+
+    Returns a list of results in input order. An item whose work_fn raised is
+    queued again with a growing delay while the others go on; items that still
+    fail after max_attempts, or are left when the circuit breaker abandons the
+    run, get None as their result.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    workers = max(1, min(workers, len(items)))
+    scheduler = RetryScheduler(items, max_attempts)
+
+    def worker(worker_id):
+        driver = None
+        try:
+            driver = launch_driver(build_driver, user_data_dir, worker_id)
+            print(f"[worker {worker_id}] Driver launched.")
+            stage = getattr(driver, "stage", None)
+            while True:
+                task = scheduler.get()
+                if task is None:
+                    break
+                index, item, attempt = task
+                started = time.monotonic()
+                try:
+                    results[index] = work_fn(driver, item)
+                except Exception as e:
+                    delay = scheduler.failed(index, item, attempt)
+                    if delay is None:
+                        metrics.count(stage, "gave_up")
+                        print(f"[worker {worker_id}] Giving up on item {index + 1} after {attempt} attempts:", e)
+                    else:
+                        metrics.count(stage, "retry")
+                        # The attempt that failed; the backoff itself blocks no one
+                        metrics.observe(stage, "retry", time.monotonic() - started)
+                        print(f"[worker {worker_id}] Error on item {index + 1} (attempt {attempt}), retrying in {delay:.0f}s:", e)
+                else:
+                    scheduler.succeeded()
+        except Exception as exc:
+            print(f"[worker {worker_id}] ERROR:", exc)
+            traceback.print_exc()
+        finally:
+            if driver:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(1, workers + 1)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return results
@@ -0,0 +1,320 @@
+"""
+embedded_state.py
+Read product, maker and link data from the JSON state Product Hunt embeds in
+its HTML (Next.js `__NEXT_DATA__`, `window.__APOLLO_STATE__` and Apollo SSR
+transport chunks) instead of waiting for and walking rendered CSS classes.
+
+Every extractor returns None when the page carries no usable state, so the
+callers can fall back to the DOM selectors. The same walker decodes the JSON
+API responses captured by driver_factory's capture mode. Check a saved page,
+or a file of captured responses (one {"url", "body"} JSON object per line), with:
+
+    python embedded_state.py page.html [product|profile|posts]
+    python embedded_state.py captures/archive_<time>.jsonl responses
+"""
+
+import json
+import re
+import sys
+
+from link_engine import classify_links
+
+BASE_URL = "https://www.producthunt.com"
+
+NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+# JSON literals that follow a JS assignment / push call
+STATE_START_RES = [
+    re.compile(r"__APOLLO_STATE__\s*=\s*"),
+    re.compile(r"ApolloSSRDataTransport\"\)\]\s*\?\?=\s*\[\]\)\.push\("),
+]
+
+MAKER_KEYS = ("makers", "teamMembers", "team", "members")
+LINK_LIST_KEYS = ("links", "socialLinks", "userLinks")
+
+_decoder = json.JSONDecoder()
+
+
+# === FINDING THE STATE ===
+def find_state_blobs(html):
+    """Every embedded JSON state object found in html."""
+    blobs = []
+    if not html:
+        return blobs
+
+    for match in NEXT_DATA_RE.finditer(html):
+        try:
+            blobs.append(json.loads(match.group(1)))
+        except ValueError:
+            pass
+
+    for start_re in STATE_START_RES:
+        for match in start_re.finditer(html):
+            try:
+                blob, _ = _decoder.raw_decode(html, match.end())
+                blobs.append(blob)
+            except ValueError:
+                pass
+    return blobs
+
+
+class State:
+    """Typed nodes from the state blobs, with Apollo `{"__ref": ...}` links resolved on access."""
+
+    def __init__(self, blobs):
+        self.entities = {}
+        self.nodes = []
+        for blob in blobs:
+            self._collect(blob)
+
+    def _collect(self, value):
+        # Depth-first in document order (children are pushed reversed), so nodes keep the order they appear in
+        stack = [value]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                for key, child in value.items():
+                    # Normalized Apollo cache: {"User:123": {...}, ...}
+                    if isinstance(child, dict) and "__typename" in child and ":" in key:
+                        self.entities.setdefault(key, child)
+                stack.extend(reversed(list(value.values())))
+                if "__typename" in value:
+                    self.nodes.append(value)
+            elif isinstance(value, list):
+                stack.extend(reversed(value))
+
+    def deref(self, value):
+        if isinstance(value, dict) and "__ref" in value:
+            return self.entities.get(value["__ref"], {})
+        return value
+
+    def get(self, node, key):
+        return self.deref(node.get(key))
+
+    def items(self, node, key):
+        """A list field as resolved dicts; also unwraps GraphQL `{edges: [{node}]}` connections."""
+        value = self.get(node, key)
+        if isinstance(value, dict):
+            value = [self.deref(e.get("node")) for e in value.get("edges") or [] if isinstance(e, dict)]
+        if not isinstance(value, list):
+            return []
+        return [v for v in (self.deref(v) for v in value) if isinstance(v, dict)]
+
+    def of_type(self, *typenames):
+        seen = set()
+        for node in self.nodes:
+            if node.get("__typename") in typenames and id(node) not in seen:
+                seen.add(id(node))
+                yield node
+
+
+def load_state(html):
+    blobs = find_state_blobs(html)
+    return State(blobs) if blobs else None
+
+
+def slug_from_url(url):
+    return url.rstrip("/").split("?")[0].rsplit("/", 1)[-1].lstrip("@").lower() if url else ""
+
+
+def profile_link(user):
+    username = user.get("username")
+    if username:
+        return f"{BASE_URL}/@{username}"
+    url = user.get("url") or ""
+    return url.split("?")[0] if url.startswith("http") else ""
+
+
+def is_external(href):
+    return bool(href) and href.startswith("http") and "producthunt.com" not in href
+
+
+# === EXTRACTORS ===
+def find_product_node(state, product_url=""):
+    """
+    The Product/Post node of product_url: the one with its slug, else (no URL
+    to match, or a single candidate) the first one carrying makers or a website.
+    """
+    slug = slug_from_url(product_url)
+    candidates = list(state.of_type("Product", "Post"))
+    for node in candidates:
+        if slug and (node.get("slug") or "").lower() == slug:
+            return node
+    if slug and len(candidates) > 1:
+        return None  # related products on the page; guessing could attach their data to this one
+    for node in candidates:
+        if any(key in node for key in MAKER_KEYS) or node.get("websiteUrl"):
+            return node
+    return None
+
+
+def maker_candidates(state, product):
+    """Makers of a product node as [{name, role, link}], in page order."""
+    candidates = []
+    seen = set()
+    for key in MAKER_KEYS:
+        for entry in state.items(product, key):
+            # Either a User or a membership wrapping one ({user, role})
+            user = state.get(entry, "user") if "user" in entry else entry
+            if not isinstance(user, dict) or not user.get("name"):
+                continue
+            link = profile_link(user)
+            if not link or link in seen:
+                continue
+            seen.add(link)
+            role = entry.get("role") or entry.get("title") or user.get("headline") or ""
+            candidates.append({"name": user["name"].strip(), "role": role.strip(), "link": link})
+    return candidates
+
+
+def extract_product(html, product_url=""):
+    """{"website", "makers": [{name, role, link}]} from embedded state, or None."""
+    state = load_state(html)
+    if state is None:
+        return None
+    product = find_product_node(state, product_url)
+    if product is None:
+        return None
+
+    website = None
+    for key in ("websiteUrl", "website", "url"):
+        if is_external(product.get(key)):
+            website = product[key]
+            break
+
+    makers = maker_candidates(state, product)
+    # A Post usually links to its Product, which carries the team and website
+    if not makers or not website:
+        parent = state.get(product, "product")
+        if isinstance(parent, dict) and parent:
+            makers = makers or maker_candidates(state, parent)
+            website = website or next((parent[k] for k in ("websiteUrl", "website") if is_external(parent.get(k))), None)
+
+    if not makers and website is None:
+        return None
+    return {"website": website, "makers": makers}
+
+
+def extract_profile_hrefs(html, profile_url=""):
+    """Every external link on a user's profile from embedded state, or None."""
+    state = load_state(html)
+    if state is None:
+        return None
+
+    username = slug_from_url(profile_url)
+    user = None
+    for node in state.of_type("User"):
+        if not username or (node.get("username") or "").lower() == username:
+            if any(key in node for key in LINK_LIST_KEYS) or node.get("websiteUrl"):
+                user = node
+                break
+    if user is None:
+        return None
+
+    hrefs = []
+    for key in LINK_LIST_KEYS:
+        for link in state.items(user, key):
+            href = link.get("url") or link.get("href")
+            if href:
+                hrefs.append(href)
+    if user.get("websiteUrl"):
+        hrefs.append(user["websiteUrl"])
+    if user.get("twitterUsername"):
+        hrefs.append(f"https://twitter.com/{user['twitterUsername']}")
+    return hrefs
+
+
+def extract_profile_links(html, profile_url=""):
+    """{platform: url} for a profile from embedded state, or None."""
+    hrefs = extract_profile_hrefs(html, profile_url)
+    if hrefs is None:
+        return None
+    return classify_links(hrefs)
+
+
+def post_record(state, post, makers=False):
+    """
+    An archive-style row (same columns as output1.csv) from a Post node.
+
+    makers=True adds a Makers column: the makers' names, comma-separated like Tags.
+    """
+    topics = [t.get("name", "") for t in state.items(post, "topics")]
+    slug = post.get("slug") or ""
+    url = post.get("url") or (f"{BASE_URL}/posts/{slug}" if slug else "")
+    record = {
+        "Title": (post.get("name") or "").strip(),
+        "URL": url.split("?")[0],
+        "Description": (post.get("tagline") or "").strip(),
+        "Tags": ", ".join(t for t in topics if t),
+        "Votes": str(post.get("votesCount", post.get("latestScore", 0)) or 0),
+    }
+    if makers:
+        record["Makers"] = ", ".join(m["name"] for m in maker_candidates(state, post))
+    return record
+
+
+def extract_posts(state, makers=False):
+    """Archive rows for every Post node in a State, in first-seen order."""
+    records = {}
+    for post in state.of_type("Post"):
+        if not post.get("name"):
+            continue
+        record = post_record(state, post, makers)
+        records.setdefault(record["URL"] or post.get("id"), record)
+    return list(records.values())
+
+
+def decode_responses(bodies, makers=True):
+    """Archive rows (with Makers) from captured API response bodies: JSON text or parsed objects."""
+    blobs = []
+    for body in bodies:
+        if isinstance(body, str):
+            try:
+                body = json.loads(body)
+            except ValueError:
+                continue  # not JSON after all
+        blobs.append(body)
+    return extract_posts(State(blobs), makers) if blobs else []
+
+
+def load_captures(path):
+    """The bodies of a captured-responses file, as written by archive_scraper's CAPTURE_DIR."""
+    bodies = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                bodies.append(json.loads(line)["body"])
+            except (ValueError, KeyError):
+                continue  # line cut short by a crash
+    return bodies
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python embedded_state.py page.html [product|profile|posts]")
+        print("       python embedded_state.py captures.jsonl responses")
+        sys.exit(1)
+
+    kind = sys.argv[2] if len(sys.argv) > 2 else "product"
+    if kind == "responses":
+        print(json.dumps(decode_responses(load_captures(sys.argv[1])), indent=2, ensure_ascii=False))
+        return
+
+    with open(sys.argv[1], encoding="utf-8") as f:
+        html = f.read()
+
+    if kind == "product":
+        result = extract_product(html)
+    elif kind == "profile":
+        result = extract_profile_links(html)
+    else:
+        state = load_state(html)
+        result = extract_posts(state) if state else None
+
+    if result is None:
+        print("No embedded state found — the scrapers will fall back to DOM selectors.")
+    else:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+http_fetcher.py
+Fetch pages over plain HTTP (aiohttp) instead of a full Chrome.
+
+One pooled keep-alive session is shared by all requests, concurrency is
+capped, and each host gets a token-bucket rate limit. Cookies are seeded from
+the Chrome profile in USER_DATA_DIR so the requests look like the same
+visitor. Pages that fail (HTTP errors, timeouts, verification pages) come
+back as None so callers can retry them in a browser.
+"""
+
+import asyncio
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+from yarl import URL
+
+# === CONFIG ===
+CONCURRENCY = 8  # requests in flight across all hosts
+RATE_PER_HOST = 2.0  # requests per second per host
+BURST_PER_HOST = 4  # requests a host may receive back to back
+REQUEST_TIMEOUT = 30
+COOKIE_DOMAIN = "producthunt.com"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+# Served instead of the real page when the site wants a human check
+BLOCK_MARKERS = ("cf-challenge", "Just a moment...", "challenge-platform")
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def load_profile_cookies(user_data_dir, domain=COOKIE_DOMAIN):
+    """
+    Unencrypted cookies for domain from a Chrome profile's cookie database.
+
+    Chrome encrypts most cookie values with an OS key; those are skipped, so
+    this only reuses cookies Chrome stored in plain text.
+    """
+    if not user_data_dir:
+        return {}
+    for rel_path in ("Default/Network/Cookies", "Default/Cookies"):
+        db_path = os.path.join(user_data_dir, rel_path)
+        if os.path.exists(db_path):
+            break
+    else:
+        return {}
+
+    # Chrome keeps the database locked while it runs; read a copy
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_path = os.path.join(tmp, "Cookies")
+        shutil.copyfile(db_path, copy_path)
+        conn = sqlite3.connect(copy_path)
+        try:
+            rows = conn.execute(
+                "SELECT name, value FROM cookies WHERE host_key LIKE ? AND value != ''",
+                (f"%{domain}",),
+            ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        finally:
+            conn.close()
+    return dict(rows)
+
+
+class HttpFetcher:
+    def __init__(self, concurrency=CONCURRENCY, rate_per_host=RATE_PER_HOST,
+                 burst_per_host=BURST_PER_HOST, cookies=None):
+        self.concurrency = concurrency
+        self.rate_per_host = rate_per_host
+        self.burst_per_host = burst_per_host
+        self.cookies = cookies or {}
+        self.buckets = {}
+        self.session = None
+        self.semaphore = None
+        self.ok = 0
+        self.failed = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        # Profile cookies are only sent back to the site they came from
+        cookie_jar = aiohttp.CookieJar()
+        cookie_jar.update_cookies(self.cookies, response_url=URL(f"https://www.{COOKIE_DOMAIN}/"))
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            headers={"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"},
+            cookie_jar=cookie_jar,
+        )
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate_per_host, self.burst_per_host)
+        return self.buckets[host]
+
+    async def fetch(self, url):
+        """Return the page html, or None if the request failed or was blocked."""
+        async with self.semaphore:
+            await self.bucket(url).acquire()
+            try:
+                async with self.session.get(url) as response:
+                    html = await response.text()
+                    if response.status != 200 or any(m in html for m in BLOCK_MARKERS):
+                        print(f"  HTTP {response.status} for {url} — leaving it for the browser.")
+                        self.failed += 1
+                        return None
+                    self.ok += 1
+                    return html
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"  HTTP error for {url}: {e!r}")
+                self.failed += 1
+                return None
+
+    async def fetch_all(self, urls):
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+
+def fetch_pages(urls, user_data_dir=None, concurrency=CONCURRENCY, rate_per_host=RATE_PER_HOST):
+    """Fetch urls over HTTP; returns a list of html-or-None in input order."""
+    urls = list(urls)
+    if not urls:
+        return []
+
+    async def run():
+        cookies = load_profile_cookies(user_data_dir)
+        async with HttpFetcher(concurrency, rate_per_host, cookies=cookies) as fetcher:
+            pages = await fetcher.fetch_all(urls)
+            print(f"HTTP fetch: {fetcher.ok} ok, {fetcher.failed} failed.")
+            return pages
+
+    return asyncio.run(run())
@@ -0,0 +1,205 @@
+"""
+link_engine.py
+URL canonicalization and social-link classification shared by all stages.
+
+Links are classified by exact host suffix: a host matches "x.com" if it is
+x.com or ends in ".x.com", so "dropbox.com" is not Twitter and a URL merely
+containing "blog" is not a Blog. Hosts are looked up in a precomputed
+{suffix: platform} table and each distinct host is parsed once. Whole
+columns of URLs go through the same table with canonicalize() and
+classify_many().
+
+The platforms, and the order of their MakerN_<Platform> columns, come from
+PLATFORM_HOSTS, or from PLATFORMS_FILE when that file exists.
+"""
+
+import json
+import os
+from functools import lru_cache
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+import pandas as pd
+
+# === CONFIG ===
+# Platform -> host suffixes, in output column order (after WEBSITE_PLATFORM)
+PLATFORM_HOSTS = {
+    "Linkedin": ["linkedin.com", "lnkd.in"],
+    "Twitter": ["twitter.com", "x.com"],
+    "GitHub": ["github.com"],
+    "YouTube": ["youtube.com", "youtu.be"],
+    "Instagram": ["instagram.com"],
+    "Blog": ["medium.com", "substack.com", "hashnode.dev", "dev.to", "blogspot.com", "wordpress.com", "ghost.io"],
+    "Facebook": ["facebook.com", "fb.com"],
+    "Telegram": ["t.me", "telegram.me"],
+}
+PLATFORMS_FILE = "platforms.json"  # optional {platform: [host suffixes]} that replaces PLATFORM_HOSTS
+BLOG_SUBDOMAINS = ("blog",)  # blog.example.com counts as a Blog
+WEBSITE_PLATFORM = "Website"  # the first external link that matches no platform
+IGNORED_HOSTS = ["producthunt.com"]  # never a maker's website
+
+BASE_URL = "https://www.producthunt.com"
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"ref", "ref_src", "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "si", "_hsenc", "_hsmi"}
+TRACKING_PREFIXES = ("utm_",)
+# Redirect wrappers whose target is in a query parameter: (host, path) -> parameter
+REDIRECTS = {
+    ("l.facebook.com", "/l.php"): "u",
+    ("lm.facebook.com", "/l.php"): "u",
+    ("l.instagram.com", "/"): "u",
+    ("www.google.com", "/url"): "q",
+    ("google.com", "/url"): "q",
+    ("www.youtube.com", "/redirect"): "q",
+    ("www.linkedin.com", "/redir/redirect"): "url",
+    ("away.vk.com", "/away.php"): "to",
+}
+MAX_REDIRECT_FOLDS = 3
+
+
+def build_host_table(platform_hosts):
+    return {suffix.lower(): platform for platform, suffixes in platform_hosts.items() for suffix in suffixes}
+
+
+def load_platform_hosts(path=PLATFORMS_FILE):
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return PLATFORM_HOSTS
+
+
+HOST_TABLE = {}
+SOCIAL_PLATFORMS = []
+
+
+def set_platforms(platform_hosts):
+    """Replace the platform table; SOCIAL_PLATFORMS (the column order) follows it."""
+    HOST_TABLE.clear()
+    HOST_TABLE.update(build_host_table(platform_hosts))
+    SOCIAL_PLATFORMS[:] = [WEBSITE_PLATFORM] + [p for p in platform_hosts if p != WEBSITE_PLATFORM]
+    platform_for_host.cache_clear()
+
+
+# === CANONICALIZATION ===
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url):
+    """
+    One spelling per link: trimmed, scheme and host lowercased, redirect
+    wrappers folded into their target and tracking parameters removed.
+    Non-http(s) values, and URLs too malformed to parse, are returned trimmed
+    but otherwise unchanged.
+    """
+    if not isinstance(url, str):
+        return url
+    url = url.strip()
+    # Relative hrefs rendered against the site twice
+    while url.startswith(BASE_URL + BASE_URL):
+        url = url[len(BASE_URL):]
+
+    try:
+        parts = urlsplit(url)
+        for _ in range(MAX_REDIRECT_FOLDS):
+            param = REDIRECTS.get(((parts.hostname or ""), parts.path or "/"))
+            target = parse_qs(parts.query).get(param, [""])[0].strip() if param else ""
+            if not target.startswith("http"):
+                break
+            url = target
+            parts = urlsplit(url)
+    except ValueError:
+        return url  # user-entered junk such as "https://[mysite].com"
+    if parts.scheme.lower() not in ("http", "https"):
+        return url
+
+    query = parts.query
+    if query:
+        # Filter the raw pairs so the kept ones stay encoded exactly as they were
+        query = "&".join(p for p in query.split("&") if p and not is_tracking_param(p.split("=", 1)[0]))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, parts.fragment))
+
+
+def canonicalize(urls):
+    """canonical_url() over a Series (or list) of URLs, computed once per distinct value."""
+    urls = pd.Series(urls, dtype=object)
+    codes, uniques = pd.factorize(urls)
+    canonical = pd.Series([canonical_url(u) for u in uniques], dtype=object)
+    # factorize gives missing values the code -1
+    return pd.Series(canonical.reindex(codes).to_numpy(), index=urls.index, dtype=object)
+
+
+# === CLASSIFICATION ===
+@lru_cache(maxsize=65536)
+def platform_for_host(host):
+    """Platform for a lowercase host, WEBSITE_PLATFORM for other hosts, None for ignored ones."""
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        suffix = ".".join(labels[i:])
+        if suffix in HOST_TABLE:
+            return HOST_TABLE[suffix]
+        if any(suffix == ignored for ignored in IGNORED_HOSTS):
+            return None
+    if len(labels) > 2 and labels[0] in BLOG_SUBDOMAINS and "Blog" in HOST_TABLE.values():
+        return "Blog"
+    return WEBSITE_PLATFORM if host else None
+
+
+def link_platform(url):
+    """Platform of a canonical URL, or None when it is not an external http(s) link (or cannot be parsed)."""
+    if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+        return None
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return None
+    return platform_for_host(host)
+
+
+def classify_links(hrefs):
+    """
+    Map one profile's hrefs to {platform: canonical url}.
+
+    As before, the last link of a platform wins, except Website, which is the first
+    external link that matches no platform.
+    """
+    social_links = {}
+    for href in hrefs:
+        if not href:
+            continue
+        url = canonical_url(href)
+        platform = link_platform(url)
+        if platform is None or (platform == WEBSITE_PLATFORM and platform in social_links):
+            continue
+        social_links[platform] = url
+    return social_links
+
+
+def classify_many(hrefs_by_key):
+    """
+    classify_links() for many profiles at once: {key: [hrefs]} -> {key: {platform: url}}.
+
+    All hrefs are canonicalized and classified as one column.
+    """
+    result = {key: {} for key in hrefs_by_key}
+    pairs = [(key, href) for key, hrefs in hrefs_by_key.items() for href in hrefs if href]
+    if not pairs:
+        return result
+
+    df = pd.DataFrame(pairs, columns=["key", "href"])
+    df["url"] = canonicalize(df["href"])
+    # Repeated URLs stay in: "last wins" must see a profile's hrefs in their original order
+    platforms = {url: link_platform(url) for url in df["url"].unique()}
+    df["platform"] = df["url"].map(platforms)
+    df = df[df["platform"].notna()]
+
+    is_website = df["platform"] == WEBSITE_PLATFORM
+    chosen = pd.concat([
+        df[~is_website].drop_duplicates(["key", "platform"], keep="last"),
+        df[is_website].drop_duplicates(["key"], keep="first"),
+    ])
+    for key, platform, url in zip(chosen["key"], chosen["platform"], chosen["url"]):
+        result[key][platform] = url
+    return result
+
+
+set_platforms(load_platform_hosts())
@@ -0,0 +1,176 @@
+"""
+metrics.py
+Timing and outcome metrics shared by all scrapers.
+
+Latencies are recorded per (stage, operation) in fixed-bucket histograms:
+navigate, wait, sleep, extract, retry and record (one whole product/profile).
+Outcomes are counted per (stage, event): success, timeout, stale, empty,
+error, retry and gave_up. At the end of a run write_reports() saves a JSON summary and
+a Prometheus text-format file (for node_exporter's textfile collector) under
+METRICS_DIR, and prints where the time went.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# === CONFIG ===
+METRICS_DIR = "metrics"
+# Histogram bucket upper bounds, in seconds
+BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot: above the largest bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (the max if it is above every bound)."""
+        if not self.count:
+            return 0.0
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= q * self.count:
+                return round(min(bound, self.max), 3)
+        return round(self.max, 3)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 3),
+            "mean_seconds": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "max_seconds": round(self.max, 3),
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (stage, op) -> Histogram
+        self.counters = {}  # (stage, event) -> int
+        self.started = time.time()
+
+    def observe(self, stage, op, seconds):
+        with self.lock:
+            key = (stage or "other", op)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(seconds)
+
+    def count(self, stage, event, n=1):
+        with self.lock:
+            key = (stage or "other", event)
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def summary(self):
+        with self.lock:
+            operations = {}
+            for (stage, op), histogram in sorted(self.histograms.items()):
+                operations.setdefault(stage, {})[op] = histogram.summary()
+            counters = {}
+            for (stage, event), n in sorted(self.counters.items()):
+                counters.setdefault(stage, {})[event] = n
+        return {
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "finished": datetime.now().isoformat(timespec="seconds"),
+            "elapsed_seconds": round(time.time() - self.started, 1),
+            "operations": operations,
+            "counters": counters,
+        }
+
+    def prometheus(self):
+        lines = [
+            "# HELP scraper_operation_seconds Latency of scraper operations.",
+            "# TYPE scraper_operation_seconds histogram",
+        ]
+        with self.lock:
+            for (stage, op), histogram in sorted(self.histograms.items()):
+                labels = f'stage="{stage}",op="{op}"'
+                cumulative = 0
+                for bound, n in zip(BUCKETS, histogram.counts):
+                    cumulative += n
+                    lines.append(f'scraper_operation_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'scraper_operation_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"scraper_operation_seconds_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"scraper_operation_seconds_count{{{labels}}} {histogram.count}")
+
+            lines += [
+                "# HELP scraper_events_total Scraper outcomes (success, timeout, stale, empty, error, retry).",
+                "# TYPE scraper_events_total counter",
+            ]
+            for (stage, event), n in sorted(self.counters.items()):
+                lines.append(f'scraper_events_total{{stage="{stage}",event="{event}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Metrics()
+
+
+@contextmanager
+def timed(stage, op):
+    """Record how long the block took as one `op` observation, even if it raises."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(stage, op, time.monotonic() - started)
+
+
+def observe(stage, op, seconds):
+    REGISTRY.observe(stage, op, seconds)
+
+
+def count(stage, event, n=1):
+    REGISTRY.count(stage, event, n)
+
+
+def pause(stage, seconds):
+    """time.sleep() that is recorded as a `sleep` observation."""
+    time.sleep(seconds)
+    REGISTRY.observe(stage, "sleep", seconds)
+
+
+def print_summary(summary):
+    print("\n=== Where the time went ===")
+    for stage, operations in summary["operations"].items():
+        for op, s in sorted(operations.items(), key=lambda item: -item[1]["total_seconds"]):
+            print(
+                f"  {stage:<8} {op:<9} {s['count']:>6}x  total {s['total_seconds']:>9.1f}s  "
+                f"mean {s['mean_seconds']:.2f}s  p95 <= {s['p95_seconds']}s"
+            )
+    for stage, counters in summary["counters"].items():
+        print(f"  {stage:<8} " + ", ".join(f"{event}: {n}" for event, n in counters.items()))
+
+
+def write_reports(name):
+    """Save metrics/<name>.json and metrics/<name>.prom and print the summary; returns the JSON path."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    summary = REGISTRY.summary()
+    json_path = os.path.join(METRICS_DIR, f"{name}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    with open(os.path.join(METRICS_DIR, f"{name}.prom"), "w", encoding="utf-8") as f:
+        f.write(REGISTRY.prometheus())
+    print_summary(summary)
+    print(f"Metrics saved to '{json_path}' and '{os.path.join(METRICS_DIR, name + '.prom')}'.")
+    return json_path
@@ -0,0 +1,282 @@
+"""
+pipeline.py
+Run the archive, product and profile stages in one process as a streaming
+pipeline instead of three scripts handing over whole CSV files.
+
+    archive (1 browser) --cards--> product (N browsers) --maker links--> profile (M browsers)
+
+Each product card goes to the product stage as soon as its scroll batch is
+harvested, and each maker link goes to the profile stage as soon as its
+product page is scraped. Stages are connected by bounded queues, so a slow
+stage throttles the one before it instead of piling up work in memory, and
+the total run time approaches that of the slowest stage. A worker keeps its
+failed items in a delayed retry queue and goes on with new ones, and all
+stages share the circuit breaker of retry_scheduler.py.
+
+Every scraped product and profile is appended to the same journals as the
+sequential stages use, as soon as it is done. After a crash, --resume
+harvests the archive again but takes the products and profiles already in the
+journals from there instead of scraping them.
+
+Writes the same three files as run_all.py's sequential mode.
+"""
+
+import argparse
+import heapq
+import itertools
+import queue
+import threading
+import time
+import traceback
+
+import pandas as pd
+
+import archive_scraper
+import metrics
+import product_scraper
+import profile_scraper
+from checkpoint import Journal
+from driver_pool import launch_driver
+from link_engine import canonical_url, canonicalize
+from profile_cache import ProfileCache, canonical_profile_url
+from result_store import ResultStore, needs_refresh
+from retry_scheduler import BREAKER, MAX_ATTEMPTS, backoff_delay
+
+# === CONFIG ===
+USER_DATA_DIR = r"D:/Work/chrome_profile"  # optional persistent profile
+PRODUCT_WORKERS = 3  # browsers in the product stage
+PROFILE_WORKERS = 2  # browsers in the profile stage
+QUEUE_SIZE = 50  # max items waiting between two stages
+
+STOP = object()  # end-of-stream marker
+
+
+class Stage:
+    def __init__(self, name, workers, build_driver, handle):
+        self.name = name
+        self.build_driver = build_driver
+        self.handle = handle
+        self.inbox = queue.Queue(maxsize=QUEUE_SIZE)
+        self.alive = workers
+        self.lock = threading.Lock()
+
+
+def stage_worker(stage, worker_id, on_done=None):
+    """
+    Take items from the stage inbox and call stage.handle(driver, item) until STOP arrives.
+
+    Failed items wait in this worker's retry heap until their backoff is over;
+    after STOP the worker finishes those before exiting.
+    """
+    driver = None
+    retries = []  # heap of (due, seq, attempt, item)
+    seq = itertools.count()
+    stopping = False
+    try:
+        driver = launch_driver(stage.build_driver, USER_DATA_DIR, worker_id)
+        print(f"[{stage.name} {worker_id}] Driver launched.")
+        while True:
+            wait = retries[0][0] - time.monotonic() if retries else None
+            if wait is not None and wait <= 0:
+                _, _, attempt, item = heapq.heappop(retries)
+            elif stopping:
+                if wait is None:
+                    break
+                time.sleep(min(wait, 5))
+                continue
+            else:
+                try:
+                    item = stage.inbox.get(timeout=wait)
+                except queue.Empty:
+                    continue
+                if item is STOP:
+                    stopping = True
+                    continue
+                attempt = 1
+
+            if not BREAKER.wait():
+                continue  # run abandoned: keep draining so upstream never blocks
+            try:
+                stage.handle(driver, item)
+                BREAKER.record(True)
+            except Exception as e:
+                BREAKER.record(False)
+                if attempt < MAX_ATTEMPTS:
+                    delay = backoff_delay(attempt)
+                    heapq.heappush(retries, (time.monotonic() + delay, next(seq), attempt + 1, item))
+                    metrics.count(stage.name, "retry")
+                    print(f"[{stage.name} {worker_id}] Error (attempt {attempt}), retrying in {delay:.0f}s:", e)
+                else:
+                    metrics.count(stage.name, "gave_up")
+                    print(f"[{stage.name} {worker_id}] Giving up after {attempt} attempts:", e)
+    except Exception as exc:
+        print(f"[{stage.name} {worker_id}] ERROR:", exc)
+        traceback.print_exc()
+        with stage.lock:
+            stage.alive -= 1
+            last = stage.alive == 0
+        if last and not stopping:
+            # No browser left in this stage: drain so upstream never blocks
+            print(f"[{stage.name}] No workers left — dropping its remaining items.")
+            while stage.inbox.get() is not STOP:
+                pass
+    finally:
+        if driver:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        if on_done:
+            on_done()
+
+
+def run_pipeline(refresh=False, resume=False):
+    cards = []
+    queued_profiles = set()
+    lock = threading.Lock()
+
+    # Journals of finished products and profiles; a resumed run starts from their records
+    product_journal = Journal(product_scraper.JOURNAL_FILE, resume=resume)
+    profile_journal = Journal(profile_scraper.JOURNAL_FILE, resume=resume)
+    products = product_journal.records()
+    links_by_url = profile_journal.records()
+    if resume:
+        print(
+            f"Resuming: {len(products)} products in '{product_scraper.JOURNAL_FILE}', "
+            f"{len(links_by_url)} profiles in '{profile_scraper.JOURNAL_FILE}'."
+        )
+
+    # Every fresh cached profile is loaded up front; workers never touch SQLite
+    cache = ProfileCache(profile_scraper.CACHE_DB, ttl_days=profile_scraper.CACHE_TTL_DAYS)
+    cached_links = cache.all_fresh()
+    print(f"{len(cached_links)} maker profiles available from cache.")
+
+    # Refresh runs skip products whose card is unchanged; their stored rows are exported as they are
+    scrape_state = {}
+    if refresh:
+        store = ResultStore(product_scraper.RESULTS_DB)
+        scrape_state = store.scrape_state()
+        store.close()
+
+    def handle_product(driver, card):
+        product_url = canonical_url(card["URL"])
+        with lock:
+            row = products.get(product_url)
+        if row is None:
+            if refresh and not needs_refresh(
+                card, scrape_state.get(product_url), product_scraper.REFRESH_MAX_AGE_DAYS, product_scraper.REFRESH_VOTE_CHANGE
+            ):
+                metrics.count(product_scraper.STAGE, "unchanged")
+                return
+            row = product_scraper.scrape_product(driver, (card["Title"], product_url))
+            if not row:
+                return
+            product_journal.append(product_url, row)
+            with lock:
+                products[product_url] = row
+        # A journaled product still hands on the makers whose profiles are not done yet
+        for key, value in row.items():
+            if not (key.endswith("_Link") and isinstance(value, str) and value.startswith("http")):
+                continue
+            url = canonical_profile_url(value)
+            with lock:
+                if url in queued_profiles or url in cached_links or url in links_by_url:
+                    continue
+                queued_profiles.add(url)
+            profile_stage.inbox.put(url)
+
+    def handle_profile(driver, url):
+        links = profile_scraper.extract_links_from_section(driver, url)
+        profile_journal.append(url, links)
+        with lock:
+            links_by_url[url] = links
+
+    product_stage = Stage("product", PRODUCT_WORKERS, product_scraper.build_driver, handle_product)
+    profile_stage = Stage("profile", PROFILE_WORKERS, profile_scraper.build_driver, handle_profile)
+
+    # The profile stage is told to stop once every product worker has finished
+    remaining_products = [PRODUCT_WORKERS]
+
+    def product_worker_done():
+        with lock:
+            remaining_products[0] -= 1
+            last = remaining_products[0] == 0
+        if last:
+            for _ in range(PROFILE_WORKERS):
+                profile_stage.inbox.put(STOP)
+
+    threads = []
+    for n in range(PRODUCT_WORKERS):
+        threads.append(threading.Thread(target=stage_worker, args=(product_stage, 1 + n, product_worker_done), daemon=True))
+    for n in range(PROFILE_WORKERS):
+        threads.append(threading.Thread(target=stage_worker, args=(profile_stage, 1 + PRODUCT_WORKERS + n), daemon=True))
+    for t in threads:
+        t.start()
+
+    # Archive stage runs on the main thread
+    driver = None
+    try:
+        driver = launch_driver(archive_scraper.build_driver, USER_DATA_DIR, 0)
+        archive_scraper.open_all_tab(driver)
+        for card in archive_scraper.stream_cards(driver):
+            cards.append(card)
+            print(f"{len(cards)}. {card['Title']} | Votes: {card['Votes']} | Tags: {card['Tags']}")
+            product_stage.inbox.put(card)
+    except Exception as exc:
+        print("ERROR in archive stage:", exc)
+        traceback.print_exc()
+    finally:
+        for _ in range(PRODUCT_WORKERS):
+            product_stage.inbox.put(STOP)
+        if driver:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    for t in threads:
+        t.join()
+    product_journal.close()
+    profile_journal.close()
+
+    for url, links in links_by_url.items():
+        cache.put(url, links)
+    print(f"Fetched {len(links_by_url)} maker profiles, reused {len(cached_links)} from cache.")
+    cache.close()
+
+    return cards, products, {**cached_links, **links_by_url}
+
+
+def main(refresh=False, resume=False):
+    cards, products, links_by_url = run_pipeline(refresh, resume)
+    if not cards:
+        print("No product cards harvested — nothing to save.")
+        return
+
+    df_archive = pd.DataFrame(cards)
+    df_archive.to_csv(archive_scraper.OUTPUT_CSV, index=False)
+
+    # The other two files are exports of the normalized store
+    df_archive["URL"] = canonicalize(df_archive["URL"])
+    store = ResultStore(product_scraper.RESULTS_DB)
+    try:
+        store.put_cards(df_archive.to_dict("records"))
+        store.put_products(products.values())
+        store.put_links(links_by_url)
+        store.export(df_archive["URL"], makers=True).to_csv(product_scraper.OUTPUT_CSV, index=False)
+        store.export(df_archive["URL"], makers=True, links=True).to_csv(profile_scraper.OUTPUT_CSV, index=False)
+    finally:
+        store.close()
+    print(
+        f"\n✅ Pipeline complete. Saved {len(df_archive)} products to '{archive_scraper.OUTPUT_CSV}', "
+        f"'{product_scraper.OUTPUT_CSV}' and '{profile_scraper.OUTPUT_CSV}'."
+    )
+    metrics.write_reports("pipeline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the archive, product and profile stages as one streaming pipeline.")
+    parser.add_argument("--resume", action="store_true", help="take products and profiles already in the stage journals from there")
+    parser.add_argument("--refresh", action="store_true", help="only scrape products that are new, changed or stale")
+    args = parser.parse_args()
+    main(refresh=args.refresh, resume=args.resume)
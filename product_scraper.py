@@ -8,51 +8,121 @@ Scrape Product Hunt product pages to extract:
 Uses undetected-chromedriver + Selenium.
 """
 
-import os
-import time
+import argparse
 import traceback
+from collections import Counter
 import pandas as pd
-import undetected_chromedriver as uc
+import driver_factory
+import metrics
+from driver_factory import load_page
+from concurrent.futures import ProcessPoolExecutor
+from checkpoint import Journal
+from result_store import ResultStore, needs_refresh
+from driver_pool import run_pool
+from tab_pipeline import run_tabs
+from snapshot_parser import (
+    save_snapshot, parse_product_page, parse_company_website, parse_maker_candidates, parse_team_url
+)
+from embedded_state import extract_product
+from http_fetcher import fetch_pages
+from link_engine import canonicalize
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
 
 # === CONFIG ===
 INPUT_CSV = "output1.csv"
 OUTPUT_CSV = "output2.csv"
+JOURNAL_FILE = "output2.journal.jsonl"  # every scraped product, appended as it completes
+RESULTS_DB = "results.sqlite"  # normalized store of every stage's results (see result_store.py)
 USER_DATA_DIR = r"D:/Work/chrome_profile"  # optional persistent profile
+LEAN_MODE = True  # block images, fonts, media and trackers (see driver_factory.py)
+HEADLESS = False  # headless Chrome is easier for the site to flag
+EAGER_LOAD = True  # driver.get returns at DOMContentLoaded
 WAIT_LONG = 30
+WORKERS = 4  # parallel Chrome instances, each with its own profile clone
+TABS = 4  # pages loading at once in each Chrome instance (see tab_pipeline.py); 1 = one page at a time
+TAB_BATCH = 20  # products handed to a browser at a time when TABS > 1
+TAB_RENDER_GRACE_MS = 5000  # tab mode: a loaded page whose elements have not rendered after this long fails
+BULK_EXTRACT = True  # read website/makers with one execute_script call instead of per-element lookups
+EMBEDDED_STATE = True  # read website/makers from the page's embedded JSON before using DOM selectors
+FETCH_BACKEND = "browser"  # "http": plain HTTP first, browser only for failed pages; "browser": Chrome for every page
+HTTP_CONCURRENCY = 8  # HTTP requests in flight (FETCH_BACKEND = "http")
+SNAPSHOT_MODE = False  # save page_source to snapshots/ and parse it offline with lxml
+PARSE_WORKERS = 2  # processes parsing snapshots while the browsers fetch
+REFRESH_MAX_AGE_DAYS = 14  # --refresh: re-scrape unchanged products scraped longer ago than this
+REFRESH_VOTE_CHANGE = 0.25  # --refresh: re-scrape products whose vote count moved by more than this share
+
+STAGE = "product"  # label for this stage in metrics.py
 
 # === KEYWORDS ===
 KEYWORDS = ["Founder", "Co-Founder", "CEO", "CTO", "Product Head", "Marketing", "Sales"]
 
 # === FUNCTIONS ===
-def clean_url(url):
-    url = url.strip()
-    while url.startswith("https://www.producthunt.comhttps://www.producthunt.com"):
-        url = url.replace("https://www.producthunt.com", "", 1)
-        url = "https://www.producthunt.com" + url
-    return url
-
-def build_driver():
-    options = uc.ChromeOptions()
-    if USER_DATA_DIR:
-        os.makedirs(USER_DATA_DIR, exist_ok=True)
-        options.add_argument(f"--user-data-dir={USER_DATA_DIR}")
-
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    driver = uc.Chrome(options=options)
-    return driver
+def build_driver(user_data_dir=USER_DATA_DIR):
+    return driver_factory.build_driver(
+        user_data_dir, lean=LEAN_MODE, headless=HEADLESS, eager=EAGER_LOAD, stage=STAGE, background_tabs=TABS > 1
+    )
 
 def wait_for_elements(driver, by_locator, timeout=WAIT_LONG):
-    return WebDriverWait(driver, timeout).until(EC.presence_of_all_elements_located(by_locator))
+    with metrics.timed(STAGE, "wait"):
+        try:
+            return WebDriverWait(driver, timeout).until(EC.presence_of_all_elements_located(by_locator))
+        except TimeoutException:
+            metrics.count(STAGE, "timeout")
+            raise
 
 def wait_for_clickable(driver, by_locator, timeout=WAIT_LONG):
-    return WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(by_locator))
+    with metrics.timed(STAGE, "wait"):
+        try:
+            return WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(by_locator))
+        except TimeoutException:
+            metrics.count(STAGE, "timeout")
+            raise
+
+# Runs in the browser; same checks as the per-element loop in get_company_website()
+COMPANY_WEBSITE_JS = """
+for (const sec of document.querySelectorAll("div[data-sentry-component='Status']")) {
+    const header = sec.querySelector("div.text-lg.font-semibold");
+    if (!header || !header.innerText.includes("Company Info")) continue;
+    for (const a of sec.querySelectorAll("a")) {
+        const href = a.href;
+        if (href && !href.includes("producthunt.com") && !href.startsWith("/") && a.innerText.trim()) {
+            return href;
+        }
+    }
+}
+return null;
+"""
+
+# Runs in the browser; returns every maker card as {name, role, link}
+MAKER_CARDS_JS = """
+const makers = [];
+for (const card of document.querySelectorAll("section[data-test^='maker-card-']")) {
+    const nameEl = card.querySelector("a.text-16.font-semibold");
+    const roleEl = card.querySelector("a.text-14.font-normal");
+    if (!nameEl || !roleEl) continue;
+    makers.push({
+        name: nameEl.innerText.trim(),
+        role: roleEl.innerText.trim(),
+        link: nameEl.href
+    });
+}
+return makers;
+"""
 
 def get_company_website(driver):
+    with metrics.timed(STAGE, "extract"):
+        return _get_company_website(driver)
+
+def _get_company_website(driver):
+    if BULK_EXTRACT:
+        try:
+            return driver.execute_script(COMPANY_WEBSITE_JS)
+        except Exception:
+            return None
+
     try:
         sections = driver.find_elements(By.CSS_SELECTOR, "div[data-sentry-component='Status']")
         for sec in sections:
@@ -68,112 +138,405 @@ def get_company_website(driver):
         return None
     return None
 
-def scrape_makers(driver):
+def select_makers(candidates):
+    """Pick up to 7 makers from [{name, role, link}], preferring KEYWORDS roles."""
     makers_data = []
     fallback_candidates = []
 
+    # Collect makers matching keywords first
+    for c in candidates:
+        if len(makers_data) >= 7:
+            break
+        profile_url = c["link"]
+        if profile_url.startswith("/"):
+            profile_url = "https://www.producthunt.com" + profile_url
+
+        if any(k.lower() in c["role"].lower() for k in KEYWORDS):
+            makers_data.append({"name": c["name"], "link": profile_url})
+        else:
+            fallback_candidates.append({"name": c["name"], "link": profile_url})
+
+    # Fill to minimum of 5 makers using fallback candidates if needed
+    if len(makers_data) < 5:
+        needed = 5 - len(makers_data)
+        makers_data.extend(fallback_candidates[:needed])
+
+    # Limit total makers to 7
+    return makers_data[:7]
+
+def scrape_makers(driver):
     try:
         maker_cards = wait_for_elements(driver, (By.CSS_SELECTOR, "section[data-test^='maker-card-']"))
+    except TimeoutException:
+        return []
+
+    with metrics.timed(STAGE, "extract"):
+        if BULK_EXTRACT:
+            return select_makers(driver.execute_script(MAKER_CARDS_JS))
 
-        # Collect makers matching keywords first
+        candidates = []
         for card in maker_cards:
-            if len(makers_data) >= 7:
-                break
             try:
                 name_el = card.find_element(By.CSS_SELECTOR, "a.text-16.font-semibold")
                 role_el = card.find_element(By.CSS_SELECTOR, "a.text-14.font-normal")
-                name = name_el.text.strip()
-                role = role_el.text.strip()
-                profile_url = name_el.get_attribute("href")
-                if profile_url.startswith("/"):
-                    profile_url = "https://www.producthunt.com" + profile_url
-
-                if any(k.lower() in role.lower() for k in KEYWORDS):
-                    makers_data.append({"name": name, "link": profile_url})
-                else:
-                    fallback_candidates.append({"name": name, "link": profile_url})
+                candidates.append({
+                    "name": name_el.text.strip(),
+                    "role": role_el.text.strip(),
+                    "link": name_el.get_attribute("href"),
+                })
+            except StaleElementReferenceException:
+                metrics.count(STAGE, "stale")
             except Exception:
                 continue
 
-        # Fill to minimum of 5 makers using fallback candidates if needed
-        if len(makers_data) < 5:
-            needed = 5 - len(makers_data)
-            makers_data.extend(fallback_candidates[:needed])
+        return select_makers(candidates)
 
-        # Limit total makers to 7
-        makers_data = makers_data[:7]
+def product_row(title, product_url, website, makers):
+    maker_entry = {}
+    for i, m in enumerate(makers, start=1):
+        maker_entry[f"Maker{i}_Name"] = m["name"]
+        maker_entry[f"Maker{i}_Link"] = m["link"]
 
-    except TimeoutException:
-        pass
+    return {
+        "Title": title,
+        "URL": product_url,
+        "Website": website,
+        **maker_entry
+    }
 
-    return makers_data
+def open_team_tab(driver):
+    team_tab = wait_for_clickable(driver, (By.CSS_SELECTOR, "a[data-test='product-navigation-item-team']"))
+    driver.execute_script("arguments[0].click();", team_tab)
+    metrics.pause(STAGE, 2)
 
-# === MAIN ===
-def main():
-    df = pd.read_csv(INPUT_CSV)
-    print(f"Loaded {len(df)} products from '{INPUT_CSV}'")
-    df["URL"] = df["URL"].apply(clean_url)
-    all_data = []
+def snapshot_product(driver, row):
+    """Save the overview and Team page sources to the snapshot store; returns both."""
+    title, product_url = row
+    print(f"Snapshotting: {product_url}")
 
-    driver = None
     try:
-        driver = build_driver()
-        print("Driver launched.\n")
+        load_page(driver, product_url)
+        metrics.pause(STAGE, 2)
+        overview_html = driver.page_source
+        save_snapshot("product", product_url, overview_html)
+
+        team_html = ""
+        try:
+            open_team_tab(driver)
+            wait_for_elements(driver, (By.CSS_SELECTOR, "section[data-test^='maker-card-']"))
+            team_html = driver.page_source
+            save_snapshot("team", product_url, team_html)
+        except TimeoutException:
+            print("  ⚠️ Team tab or makers not found.")
+
+        return overview_html, team_html
+
+    except WebDriverException as e:
+        print("Error scraping product page:", e)
+        metrics.count(STAGE, "error")
+        raise
+
+def scrape_product(driver, row):
+    """
+    Scrape one (title, url) row; the whole call is timed as a `record` and its outcome counted.
+
+    WebDriverExceptions (timeouts, verification pages, crashed tabs) are raised,
+    so the driver pool can retry the row later.
+    """
+    with metrics.timed(STAGE, "record"):
+        try:
+            result = _scrape_product(driver, row)
+        except WebDriverException:
+            metrics.count(STAGE, "error")
+            raise
+    if not result["Website"] and "Maker1_Name" not in result:
+        metrics.count(STAGE, "empty")
+    else:
+        metrics.count(STAGE, "success")
+    return result
+
+def _scrape_product(driver, row):
+    title, product_url = row
+    print(f"Scraping: {product_url}")
 
-        for idx, row in df.iterrows():
-            product_url = row["URL"]
-            print(f"[{idx+1}/{len(df)}] Scraping: {product_url}")
+    try:
+        load_page(driver, product_url)
+
+        # Fast path: the server-rendered state already lists website and team
+        if EMBEDDED_STATE:
+            with metrics.timed(STAGE, "extract"):
+                state = extract_product(driver.page_source, product_url)
+            if state and state["makers"]:
+                makers = select_makers(state["makers"])
+                print(f"  From embedded state: website {state['website'] or 'not found'}, {len(makers)} makers.")
+                return product_row(title, product_url, state["website"], makers)
+
+        metrics.pause(STAGE, 2)
+
+        # Extract website
+        website = get_company_website(driver)
+        if website:
+            print(f"  Website found: {website}")
+        else:
+            print("  No website found.")
+
+        # Open Team tab
+        try:
+            open_team_tab(driver)
+            print("  Team tab opened.")
+        except TimeoutException:
+            print("  ⚠️ Team tab not found, skipping makers.")
+            return product_row(title, product_url, website, [])
+
+        # Extract makers
+        makers = scrape_makers(driver)
+        print(f"  Found {len(makers)} makers.")
+
+        return product_row(title, product_url, website, makers)
+
+    except WebDriverException as e:
+        print("Error scraping product page:", e)
+        raise
+
+# Tab mode: a page is harvested once these have rendered. A page that stays
+# without them TAB_RENDER_GRACE_MS after it loaded (a verification page, a 404)
+# is handed to harvest too, which fails it instead of recording an empty product.
+TAB_READY_JS = {
+    "overview": "document.querySelector(\"div[data-sentry-component='Status']\")",
+    "team": "document.querySelector(\"section[data-test^='maker-card-']\")",
+}
+TEAM_HREF_JS = """
+const link = document.querySelector("a[data-test='product-navigation-item-team']");
+return link ? link.href : null;
+"""
 
-            try:
-                driver.get(product_url)
-                time.sleep(2)
-
-                # Extract website
-                website = get_company_website(driver)
-                if website:
-                    print(f"  Website found: {website}")
-                else:
-                    print("  No website found.")
-
-                # Open Team tab
-                try:
-                    team_tab = wait_for_clickable(driver, (By.CSS_SELECTOR, "a[data-test='product-navigation-item-team']"))
-                    driver.execute_script("arguments[0].click();", team_tab)
-                    time.sleep(2)
-                    print("  Team tab opened.")
-                except TimeoutException:
-                    print("  ⚠️ Team tab not found, skipping makers.")
-                    all_data.append({
-                        "Title": row["Title"],
-                        "URL": product_url,
-                        "Website": website
-                    })
-                    continue
-
-                # Extract makers
-                makers = scrape_makers(driver)
-                maker_entry = {}
-                for i, m in enumerate(makers, start=1):
-                    maker_entry[f"Maker{i}_Name"] = m["name"]
-                    maker_entry[f"Maker{i}_Link"] = m["link"]
-
-                print(f"  Found {len(makers)} makers.")
-
-                all_data.append({
-                    "Title": row["Title"],
-                    "URL": product_url,
-                    "Website": website,
-                    **maker_entry
-                })
+def tab_ready(key):
+    return f"{TAB_READY_JS[key[1]]} || (document.readyState === 'complete' && performance.now() > {TAB_RENDER_GRACE_MS})"
+
+def require_rendered(driver, kind, url):
+    """Raise if the page's TAB_READY_JS element is missing, i.e. it was only ready because the grace ran out."""
+    if not driver.execute_script(f"return !!({TAB_READY_JS[kind]});"):
+        metrics.count(STAGE, "timeout")
+        raise TimeoutException(f"{url} loaded but its {kind} content did not render within {TAB_RENDER_GRACE_MS} ms")
+
+def scrape_products_in_tabs(driver, rows):
+    """
+    Scrape a batch of (title, url) rows with TABS pages loading at once in one browser.
+
+    Overview and Team pages are opened by URL (the Team link read from the
+    overview), with no tab clicks or fixed sleeps. Returns product rows in
+    input order, None for products that failed.
+    """
+    websites = {}
+    makers = {}
+
+    def harvest(driver, key, url):
+        i, kind = key
+        if kind == "team":
+            require_rendered(driver, "team", url)
+            with metrics.timed(STAGE, "extract"):
+                makers[i] = select_makers(driver.execute_script(MAKER_CARDS_JS))
+            return None
+        html = None
+        if EMBEDDED_STATE:
+            with metrics.timed(STAGE, "extract"):
+                html = driver.page_source
+                state = extract_product(html, rows[i][1])
+            if state and state["makers"]:
+                websites[i], makers[i] = state["website"], select_makers(state["makers"])
+                return None
+        require_rendered(driver, "overview", url)
+        websites[i] = get_company_website(driver)
+        team_href = parse_team_url(html, base_url=url) if html is not None else driver.execute_script(TEAM_HREF_JS)
+        if not team_href:
+            # Like the one-page path: no Team tab, no makers
+            makers[i] = []
+            return None
+        return [((i, "team"), team_href)]
+
+    jobs = [((i, "overview"), product_url) for i, (_, product_url) in enumerate(rows)]
+
+    failed = run_tabs(driver, jobs, harvest, TABS, ready=tab_ready)
+    for (i, kind), e in failed.items():
+        print(f"  ⚠️ {kind} page of {rows[i][1]} failed in tab mode:", e)
+
+    failed_rows = {i for i, _ in failed}
+    results = []
+    for i, (title, product_url) in enumerate(rows):
+        if i in failed_rows or i not in makers:
+            results.append(None)
+            continue
+        print(f"  {title}: website {websites.get(i) or 'not found'}, {len(makers[i])} makers.")
+        metrics.count(STAGE, "success" if websites.get(i) or makers[i] else "empty")
+        results.append(product_row(title, product_url, websites.get(i), makers[i]))
+    return results
+
+def scrape_products_http(rows):
+    """
+    Scrape products over plain HTTP; returns {row index: product row}.
+
+    Rows missing from the result (failed requests, pages that need
+    JavaScript to show their data) are left for the browser.
+    """
+    results = {}
+    overviews = fetch_pages([url for _, url in rows], user_data_dir=USER_DATA_DIR, concurrency=HTTP_CONCURRENCY)
+
+    team_pages = {}
+    for i, ((title, product_url), html) in enumerate(zip(rows, overviews)):
+        if html is None:
+            continue
+        state = extract_product(html, product_url)
+        if state and state["makers"]:
+            results[i] = product_row(title, product_url, state["website"], select_makers(state["makers"]))
+            continue
+        team_url = parse_team_url(html)
+        if team_url:
+            team_pages[i] = (parse_company_website(html), team_url)
+
+    team_indexes = list(team_pages)
+    team_html = fetch_pages([team_pages[i][1] for i in team_indexes], user_data_dir=USER_DATA_DIR, concurrency=HTTP_CONCURRENCY)
+    for i, html in zip(team_indexes, team_html):
+        candidates = parse_maker_candidates(html) if html else []
+        if candidates:
+            title, product_url = rows[i]
+            results[i] = product_row(title, product_url, team_pages[i][0], select_makers(candidates))
+
+    metrics.count(STAGE, "success", len(results))
+    print(f"HTTP backend scraped {len(results)}/{len(rows)} products.")
+    return results
+
+def scrape_products(rows, journal=None):
+    """
+    Scrape (title, url) rows; returns product rows in input order (None where scraping failed).
+
+    With a journal, every product row is appended to it as soon as it is scraped.
+    """
+    results = [None] * len(rows)
+
+    def record(result):
+        if result and journal:
+            journal.append(result["URL"], result)
+        return result
+
+    if FETCH_BACKEND == "http" and rows:
+        for i, row in scrape_products_http(rows).items():
+            results[i] = record(row)
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    if pending and TABS > 1 and not SNAPSHOT_MODE:
+        batches = [pending[n:n + TAB_BATCH] for n in range(0, len(pending), TAB_BATCH)]
+        print(f"Scraping {len(pending)} products in {TABS} tabs per browser with {WORKERS} worker(s).\n")
+        batch_results = run_pool(
+            batches,
+            lambda driver, batch: scrape_products_in_tabs(driver, [rows[i] for i in batch]),
+            build_driver,
+            workers=WORKERS,
+            user_data_dir=USER_DATA_DIR,
+        )
+        for batch, batch_rows in zip(batches, batch_results):
+            for i, row in zip(batch, batch_rows or []):
+                results[i] = record(row)
+        pending = [i for i, r in enumerate(results) if r is None]
+        if pending:
+            print(f"{len(pending)} products left for one page at a time.")
+
+    if not pending:
+        return results
+    browser_rows = [rows[i] for i in pending]
+    print(f"Scraping {len(browser_rows)} product pages with {WORKERS} worker(s).\n")
+
+    if SNAPSHOT_MODE:
+        # Browsers only fetch; parsing runs in a process pool meanwhile
+        with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+            def fetch(driver, row):
+                pages = snapshot_product(driver, row)
+                def on_parsed(future):
+                    if not future.exception():
+                        parsed = future.result()
+                        record(product_row(*row, parsed["website"], parsed["makers"]))
+
+                future = executor.submit(parse_product_page, *pages, row[1])
+                future.add_done_callback(on_parsed)
+                return future
+
+            futures = run_pool(browser_rows, fetch, build_driver, workers=WORKERS, user_data_dir=USER_DATA_DIR)
+            # A snapshot that failed to parse (or a broken pool) only loses its own product
+            parsed = []
+            for (_, url), future in zip(browser_rows, futures):
+                error = future.exception() if future else None
+                if error:
+                    metrics.count(STAGE, "error")
+                    print(f"  ⚠️ Could not parse the snapshot of {url}:", error)
+                parsed.append(future.result() if future and not error else None)
+        browser_results = [
+            product_row(title, url, p["website"], p["makers"]) if p else None
+            for (title, url), p in zip(browser_rows, parsed)
+        ]
+    else:
+        browser_results = run_pool(
+            browser_rows,
+            lambda driver, row: record(scrape_product(driver, row)),
+            build_driver,
+            workers=WORKERS,
+            user_data_dir=USER_DATA_DIR,
+        )
+
+    for i, row in zip(pending, browser_results):
+        results[i] = row
+    return results
+
+def refresh_plan(store, cards):
+    """
+    The (title, url) rows, out of {row: archive card}, whose product must be scraped again.
+
+    Prints how many products are new, changed, moved in votes or stale.
+    """
+    state = store.scrape_state()
+    reasons = {
+        row: needs_refresh(card, state.get(row[1]), REFRESH_MAX_AGE_DAYS, REFRESH_VOTE_CHANGE)
+        for row, card in cards.items()
+    }
+    rows = [row for row, reason in reasons.items() if reason]
+    counts = Counter(reason for reason in reasons.values() if reason)
+    carried = len(reasons) - len(rows)
+    metrics.count(STAGE, "unchanged", carried)
+    print(
+        f"Refresh: {counts['new']} new, {counts['changed']} changed, {counts['votes']} with new votes, "
+        f"{counts['stale']} older than {REFRESH_MAX_AGE_DAYS} days; carrying {carried} unchanged products forward."
+    )
+    return rows
 
-            except WebDriverException as e:
-                print("Error scraping product page:", e)
-                continue
+# === MAIN ===
+def main(resume=False, refresh=False):
+    df = pd.read_csv(INPUT_CSV)
+    print(f"Loaded {len(df)} products from '{INPUT_CSV}'")
+    df["URL"] = canonicalize(df["URL"])
 
-        # === 🔧 UPDATED: retain all original columns ===
-        df_new = pd.DataFrame(all_data)
-        df_merged = pd.merge(df, df_new, on=["Title", "URL"], how="left")
-        df_merged.to_csv(OUTPUT_CSV, index=False)
+    store = ResultStore(RESULTS_DB)
+    journal = Journal(JOURNAL_FILE, resume=resume)
+    try:
+        cards = df.to_dict("records")
+        store.put_cards(cards)
+        # The same product listed twice (e.g. under two spellings of its URL) is scraped once
+        rows = list(dict.fromkeys(zip(df["Title"], df["URL"])))
+        if refresh:
+            # Products whose card matches the one they were scraped from keep their stored data
+            by_row = {}
+            for card in cards:
+                by_row.setdefault((card["Title"], card["URL"]), card)
+            rows = refresh_plan(store, by_row)
+        if resume:
+            done = journal.done_keys()
+            rows = [row for row in rows if row[1] not in done]
+            print(f"Resuming: {len(done)} products already in '{JOURNAL_FILE}', {len(rows)} left.")
+        scrape_products(rows, journal)
+
+        # The journal holds every product scraped so far, including earlier runs
+        store.put_products(journal.records().values())
+
+        # output2.csv is an export of the store: all original columns plus Website and makers
+        df_out = store.export(df["URL"], makers=True)
+        df_out.to_csv(OUTPUT_CSV, index=False)
         print(f"\n✅ Scraping complete. Saved merged data (all columns retained) to '{OUTPUT_CSV}'")
 
     except Exception as exc:
@@ -181,10 +544,14 @@ def main():
         traceback.print_exc()
 
     finally:
-        if driver:
-            # driver.quit()  # Uncomment to auto-close browser
-            print("Driver still running (close manually).")
+        journal.close()
+        store.close()
+        metrics.write_reports(STAGE)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape website and makers for every product in INPUT_CSV.")
+    parser.add_argument("--resume", action="store_true", help=f"skip products already in {JOURNAL_FILE}")
+    parser.add_argument("--refresh", action="store_true", help="only scrape products that are new, changed or stale")
+    args = parser.parse_args()
+    main(resume=args.resume, refresh=args.refresh)
@@ -0,0 +1,88 @@
+"""
+profile_cache.py
+On-disk SQLite cache of maker profile links, keyed by canonical profile URL.
+
+Entries older than the TTL are treated as missing, so a profile is refetched
+at most once per TTL no matter how many products list the same maker.
+"""
+
+import json
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+# === CONFIG ===
+CACHE_DB = "profile_cache.sqlite"
+CACHE_TTL_DAYS = 30
+
+
+def canonical_profile_url(url):
+    """Normalize a Product Hunt profile URL so every spelling maps to one key."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host in ("producthunt.com", "www.producthunt.com"):
+        host = "www.producthunt.com"
+        # Usernames are case-insensitive on Product Hunt
+        path = parts.path.lower()
+    else:
+        path = parts.path
+    path = path.rstrip("/") or "/"
+    return f"https://{host}{path}"
+
+
+class ProfileCache:
+    def __init__(self, path=CACHE_DB, ttl_days=CACHE_TTL_DAYS):
+        self.ttl_seconds = ttl_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " url TEXT PRIMARY KEY,"
+            " links TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        """Return the cached links dict for url, or None if missing/expired."""
+        row = self.conn.execute(
+            "SELECT links, fetched_at FROM profiles WHERE url = ?",
+            (canonical_profile_url(url),),
+        ).fetchone()
+        if row and time.time() - row[1] < self.ttl_seconds:
+            self.hits += 1
+            return json.loads(row[0])
+        self.misses += 1
+        return None
+
+    def all_fresh(self):
+        """{url: links} for every entry that has not expired."""
+        rows = self.conn.execute(
+            "SELECT url, links FROM profiles WHERE fetched_at >= ?",
+            (time.time() - self.ttl_seconds,),
+        ).fetchall()
+        return {url: json.loads(links) for url, links in rows}
+
+    def put(self, url, links):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO profiles (url, links, fetched_at) VALUES (?, ?, ?)",
+            (canonical_profile_url(url), json.dumps(links), time.time()),
+        )
+        self.conn.commit()
+
+    def purge_expired(self):
+        cur = self.conn.execute(
+            "DELETE FROM profiles WHERE fetched_at < ?",
+            (time.time() - self.ttl_seconds,),
+        )
+        self.conn.commit()
+        return cur.rowcount
+
+    def stats(self):
+        return f"cache hits: {self.hits}, misses: {self.misses}"
+
+    def close(self):
+        self.conn.close()
@@ -5,168 +5,263 @@ Extract links ONLY from the "Links" section (LinkedIn, YouTube, Website, etc.)
 Save results in a new CSV with added columns immediately after each maker's Link.
 """
 
-import os
-import time
+import argparse
 import traceback
 import pandas as pd
-import undetected_chromedriver as uc
+import driver_factory
+import metrics
+from driver_factory import load_page
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from checkpoint import Journal
+from driver_pool import run_pool
+from profile_cache import ProfileCache
+from result_store import ResultStore
+from snapshot_parser import save_snapshot, parse_profile_hrefs, parse_profile_links
+from link_engine import classify_links, classify_many
+from embedded_state import extract_profile_links
+from http_fetcher import fetch_pages
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 
 # === CONFIG ===
 INPUT_CSV = "output2.csv"
 USER_DATA_DIR = r"D:/Work/chrome_profile"  # optional persistent profile
+LEAN_MODE = True  # block images, fonts, media and trackers (see driver_factory.py)
+HEADLESS = False  # headless Chrome is easier for the site to flag
+EAGER_LOAD = True  # driver.get returns at DOMContentLoaded
 WAIT_SHORT = 5
 WAIT_LONG = 15
-MAX_RETRIES = 3
-ROW_LIMIT = 20  # limit for testing
+MAX_RETRIES = 3  # attempts per profile; failed ones are retried later with backoff (see retry_scheduler.py)
+ROW_LIMIT = None  # e.g. 20 to try a run on the first rows only (--limit)
+WORKERS = 4  # parallel Chrome instances, each with its own profile clone
+CACHE_DB = "profile_cache.sqlite"  # maker profiles already scraped
+CACHE_TTL_DAYS = 30  # refetch a cached profile after this many days
+RESULTS_DB = "results.sqlite"  # normalized store of every stage's results (see result_store.py)
+EMBEDDED_STATE = True  # read links from the page's embedded JSON before using DOM selectors
+FETCH_BACKEND = "http"  # "http": plain HTTP first, browser only for failed pages; "browser": Chrome for every page
+HTTP_CONCURRENCY = 8  # HTTP requests in flight (FETCH_BACKEND = "http")
+SNAPSHOT_MODE = False  # save page_source to snapshots/ and parse it offline with lxml
+PARSE_WORKERS = 2  # processes parsing snapshots while the browsers fetch
+
+STAGE = "profile"  # label for this stage in metrics.py
 
 # Generate timestamp for output CSV
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 OUTPUT_CSV = f"output_final_{timestamp}.csv"
+JOURNAL_FILE = "output_final.journal.jsonl"  # every scraped profile, appended as it completes
 
 # === FUNCTIONS ===
-def build_driver():
-    options = uc.ChromeOptions()
-    if USER_DATA_DIR:
-        os.makedirs(USER_DATA_DIR, exist_ok=True)
-        options.add_argument(f"--user-data-dir={USER_DATA_DIR}")
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    driver = uc.Chrome(options=options)
-    return driver
+def build_driver(user_data_dir=USER_DATA_DIR):
+    return driver_factory.build_driver(user_data_dir, lean=LEAN_MODE, headless=HEADLESS, eager=EAGER_LOAD, stage=STAGE)
 
-def extract_links_from_section(driver, profile_url):
-    social_links = {}
-    for attempt in range(MAX_RETRIES):
+def wait_for_profile_render(driver):
+    with metrics.timed(STAGE, "wait"):
         try:
-            driver.get(profile_url)
             WebDriverWait(driver, WAIT_LONG).until(
                 EC.presence_of_all_elements_located((By.TAG_NAME, "a"))
             )
-            time.sleep(1.5)
-
-            # Check if "Links" section exists
-            try:
-                links_section = driver.find_element(
-                    By.XPATH,
-                    "//h2[text()='Links']/following-sibling::div"
-                )
-            except Exception:
-                return {}  # Section not found → return empty dict
-
-            links = links_section.find_elements(By.TAG_NAME, "a")
-            for link in links:
-                href = link.get_attribute("href")
-                if not href:
-                    continue
-                href_lower = href.lower()
-
-                if "linkedin.com" in href_lower:
-                    social_links["Linkedin"] = href
-                elif "twitter.com" in href_lower or "x.com" in href_lower:
-                    social_links["Twitter"] = href
-                elif "github.com" in href_lower:
-                    social_links["GitHub"] = href
-                elif "youtube.com" in href_lower or "youtu.be" in href_lower:
-                    social_links["YouTube"] = href
-                elif "instagram.com" in href_lower:
-                    social_links["Instagram"] = href
-                elif any(x in href_lower for x in ["medium.com", "blog", "substack.com"]):
-                    social_links["Blog"] = href
-                elif "facebook.com" in href_lower:
-                    social_links["Facebook"] = href
-                elif "t.me" in href_lower or "telegram.me" in href_lower:
-                    social_links["Telegram"] = href
-                elif "producthunt.com" not in href_lower and href_lower.startswith("http"):
-                    if "Website" not in social_links:
-                        social_links["Website"] = href
-
-            break  # exit retry loop if successful
+        except TimeoutException:
+            metrics.count(STAGE, "timeout")
+            raise
+    metrics.pause(STAGE, 1.5)
+
+def load_profile_page(driver, profile_url):
+    load_page(driver, profile_url)
+    wait_for_profile_render(driver)
+
+def extract_links_from_section(driver, profile_url):
+    """
+    Scrape one profile's links; the whole call is timed as a `record`.
+
+    Raises on failure, so the driver pool can retry the profile later instead of blocking here.
+    """
+    with metrics.timed(STAGE, "record"):
+        try:
+            return _extract_links_from_section(driver, profile_url)
+        except StaleElementReferenceException:
+            metrics.count(STAGE, "stale")
+            raise
         except Exception:
-            time.sleep(2)
-            continue
+            metrics.count(STAGE, "error")
+            raise
 
+def _extract_links_from_section(driver, profile_url):
+    load_page(driver, profile_url)
+    if EMBEDDED_STATE:
+        # The links are in the server-rendered state; no need to wait for rendering
+        with metrics.timed(STAGE, "extract"):
+            state_links = extract_profile_links(driver.page_source, profile_url)
+        if state_links is not None:
+            metrics.count(STAGE, "success" if state_links else "empty")
+            return state_links
+
+    wait_for_profile_render(driver)
+
+    # Check if "Links" section exists
+    try:
+        links_section = driver.find_element(
+            By.XPATH,
+            "//h2[text()='Links']/following-sibling::div"
+        )
+    except NoSuchElementException:
+        metrics.count(STAGE, "empty")
+        return {}  # Section not found → return empty dict
+
+    with metrics.timed(STAGE, "extract"):
+        links = links_section.find_elements(By.TAG_NAME, "a")
+        social_links = classify_links(link.get_attribute("href") for link in links)
+
+    metrics.count(STAGE, "success" if social_links else "empty")
     return social_links
 
+def snapshot_profile(driver, profile_url):
+    """Load a profile, save its page source to the snapshot store and return it; raises on failure."""
+    try:
+        load_profile_page(driver, profile_url)
+    except Exception:
+        metrics.count(STAGE, "error")
+        raise
+    html = driver.page_source
+    save_snapshot("profile", profile_url, html)
+    return html
+
+def fetch_profiles(profile_urls, journal=None):
+    """
+    Scrape social links for each profile URL; returns {url: links} for the ones that succeeded.
+
+    With a journal, each profile's links are appended to it as soon as they are scraped.
+    """
+    links_by_url = {}
+    browser_urls = list(profile_urls)
+
+    def record(url, links):
+        if links is not None and journal:
+            journal.append(url, links)
+        return links
+
+    if FETCH_BACKEND == "http" and browser_urls:
+        print(f"Fetching {len(browser_urls)} maker profiles over HTTP.")
+        pages = fetch_pages(browser_urls, user_data_dir=USER_DATA_DIR, concurrency=HTTP_CONCURRENCY)
+        hrefs_by_url = {}
+        for url, html in zip(browser_urls, pages):
+            hrefs = parse_profile_hrefs(html, url, strict=True) if html is not None else None
+            if hrefs is not None:
+                hrefs_by_url[url] = hrefs
+        # Every fetched profile's links are classified together, as one column
+        for url, links in classify_many(hrefs_by_url).items():
+            links_by_url[url] = record(url, links)
+        metrics.count(STAGE, "success", len(links_by_url))
+        browser_urls = [url for url in browser_urls if url not in links_by_url]
+        if not browser_urls:
+            return links_by_url
+
+    print(f"Visiting {len(browser_urls)} maker profiles with {WORKERS} worker(s).\n")
+    if SNAPSHOT_MODE:
+        # Browsers only fetch; parsing runs in a process pool meanwhile
+        with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+            def fetch(driver, url):
+                html = snapshot_profile(driver, url)
+                def on_parsed(future):
+                    if not future.exception():
+                        record(url, future.result())
+
+                future = executor.submit(parse_profile_links, html, url)
+                future.add_done_callback(on_parsed)
+                return future
+
+            futures = run_pool(
+                browser_urls, fetch, build_driver, workers=WORKERS, user_data_dir=USER_DATA_DIR, max_attempts=MAX_RETRIES
+            )
+            # A snapshot that failed to parse (or a broken pool) only loses its own profile
+            results = []
+            for url, future in zip(browser_urls, futures):
+                error = future.exception() if future else None
+                if error:
+                    metrics.count(STAGE, "error")
+                    print(f"  ⚠️ Could not parse the snapshot of {url}:", error)
+                results.append(future.result() if future and not error else None)
+    else:
+        results = run_pool(
+            browser_urls,
+            lambda driver, url: record(url, extract_links_from_section(driver, url)),
+            build_driver,
+            workers=WORKERS,
+            user_data_dir=USER_DATA_DIR,
+            max_attempts=MAX_RETRIES,
+        )
+
+    for url, links in zip(browser_urls, results):
+        if links is not None:
+            links_by_url[url] = links
+    return links_by_url
+
 # === MAIN ===
-def main():
+def main(resume=False, limit=ROW_LIMIT):
     df = pd.read_csv(INPUT_CSV)
     print(f"Loaded {len(df)} products from '{INPUT_CSV}'")
 
-    # Limit to first ROW_LIMIT rows for testing
-    df = df.head(ROW_LIMIT)
-    print(f"Processing only first {len(df)} products for now.\n")
+    if limit:
+        df = df.head(limit)
+        print(f"Processing only the first {len(df)} products.\n")
 
-    driver = None
-    all_data = []
+    cache = ProfileCache(CACHE_DB, ttl_days=CACHE_TTL_DAYS)
+    store = ResultStore(RESULTS_DB)
+    journal = Journal(JOURNAL_FILE, resume=resume)
 
     try:
-        driver = build_driver()
-        print("Driver launched.\n")
-
-        for idx, row in df.iterrows():
-            print(f"[{idx+1}/{len(df)}] Processing product: {row['Title']}")
-            row_data = row.to_dict()
-
-            # Detect all maker columns dynamically
-            maker_columns = [col for col in df.columns if "_Name" in col]
-
-            for maker_col in maker_columns:
-                maker_index = maker_col.replace("Maker", "").replace("_Name", "")
-                link_col = f"Maker{maker_index}_Link"
-                profile_url = row.get(link_col, "")
-                if pd.isna(profile_url) or not profile_url.startswith("http"):
-                    continue
-
-                # Extract social links
-                social_links = extract_links_from_section(driver, profile_url)
-
-                # Insert links immediately after MakerX_Link
-                for platform in ["Website", "Linkedin", "Twitter", "GitHub", "YouTube", "Instagram", "Blog", "Facebook", "Telegram"]:
-                    col_name = f"Maker{maker_index}_{platform}"
-                    row_data[col_name] = social_links.get(platform, "")
-
-            all_data.append(row_data)
-
-        # Save final CSV
-        df_out = pd.DataFrame(all_data)
-
-        # --- FIXED COLUMN ORDER ---
-        # Keep all original columns and insert social links immediately after each maker's link
-        original_cols = list(df.columns)
-        social_platforms = ["Website", "Linkedin", "Twitter", "GitHub", "YouTube", "Instagram", "Blog", "Facebook", "Telegram"]
-
-        final_cols = []
-        for col in original_cols:
-            final_cols.append(col)
-            if "_Link" in col:
-                maker_index = col.replace("Maker", "").replace("_Link", "")
-                for platform in social_platforms:
-                    social_col = f"Maker{maker_index}_{platform}"
-                    if social_col in df_out.columns and social_col not in final_cols:
-                        final_cols.append(social_col)
-
-        # Add any extra columns that may have been added dynamically
-        for col in df_out.columns:
-            if col not in final_cols:
-                final_cols.append(col)
-
-        df_out = df_out[final_cols]
+        # The products and their makers are read into the store; profiles are looked up from there
+        rows = df.to_dict("records")
+        store.put_cards(rows)
+        store.put_products(rows, scraped=False)
+
+        # Profiles finished by an interrupted run come straight from the journal
+        links_by_url = journal.records() if resume else {}
+        if resume:
+            print(f"Resuming: {len(links_by_url)} profiles already in '{JOURNAL_FILE}'.")
+            for url, links in links_by_url.items():
+                cache.put(url, links)
+
+        # Each distinct profile is looked up once; only cache misses are fetched
+        all_urls = store.maker_urls(df["URL"])
+        unique_urls = list(dict.fromkeys(all_urls))
+        to_fetch = []
+        for url in unique_urls:
+            if url in links_by_url:
+                continue
+            cached = cache.get(url)
+            if cached is None:
+                to_fetch.append(url)
+            else:
+                links_by_url[url] = cached
+
+        print(f"{len(all_urls)} maker links, {len(unique_urls)} distinct profiles, {len(to_fetch)} to fetch ({cache.stats()}).")
+        for url, links in fetch_profiles(to_fetch, journal).items():
+            cache.put(url, links)
+            links_by_url[url] = links
+
+        # Save final CSV: an export of the store with MakerN_<Platform> after each MakerN_Link
+        store.put_links(links_by_url)
+        df_out = store.export(df["URL"], makers=True, links=True)
         df_out.to_csv(OUTPUT_CSV, index=False)
         print(f"\n✅ Scraping complete. Saved {len(df_out)} products to '{OUTPUT_CSV}'")
+        print(f"Profile {cache.stats()}, page loads saved: {len(all_urls) - len(to_fetch)}")
 
     except Exception as exc:
         print("ERROR:", exc)
         traceback.print_exc()
 
     finally:
-        if driver:
-            # driver.quit()  # Uncomment to auto-close browser
-            print("Driver still running (close manually) — uncomment driver.quit() to close automatically.")
+        journal.close()
+        cache.close()
+        store.close()
+        metrics.write_reports(STAGE)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape social links for every maker in INPUT_CSV.")
+    parser.add_argument("--resume", action="store_true", help=f"skip profiles already in {JOURNAL_FILE}")
+    parser.add_argument("--limit", type=int, default=ROW_LIMIT, help="only process the first N products")
+    args = parser.parse_args()
+    main(resume=args.resume, limit=args.limit)
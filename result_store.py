@@ -0,0 +1,330 @@
+"""
+result_store.py
+Normalized SQLite store of everything the stages scrape.
+
+    products        one row per product URL (archive card fields + website)
+    makers          one row per canonical maker profile URL, shared by every product that lists it
+    product_makers  (product, position) -> maker
+    links           (maker, platform) -> url
+
+Stages write here instead of merging CSVs. The wide CSV layout (MakerN_Name,
+MakerN_Link, MakerN_<Platform>) is only produced on export, with one pivot
+per table, so joins and re-exports stay fast however many rows there are.
+
+For refresh runs each product also remembers the card it was scraped from (a
+content hash of its text and its vote count), so needs_refresh() can tell a
+new, changed or stale product from one whose stored data can be carried forward.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+from link_engine import SOCIAL_PLATFORMS
+from profile_cache import canonical_profile_url
+
+# === CONFIG ===
+RESULTS_DB = "results.sqlite"
+
+CARD_COLUMNS = ["Title", "URL", "Description", "Tags", "Votes"]
+HASHED_COLUMNS = ["Title", "Description", "Tags"]  # card text whose change means the product changed
+VOTE_CHANGE_FLOOR = 20  # a vote change is relative to at least this many votes, so 2 -> 4 is not "changed"
+MAKER_COLUMN_RE = re.compile(r"^Maker(\d+)_(\w+)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    tags TEXT,
+    votes TEXT,
+    day TEXT,
+    extra TEXT,
+    website TEXT,
+    scraped_at REAL,
+    card_hash TEXT,
+    scraped_hash TEXT,
+    scraped_votes TEXT
+);
+CREATE TABLE IF NOT EXISTS makers (
+    url TEXT PRIMARY KEY,
+    name TEXT,
+    link TEXT
+);
+CREATE TABLE IF NOT EXISTS product_makers (
+    product_url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    maker_url TEXT NOT NULL,
+    PRIMARY KEY (product_url, position)
+);
+CREATE INDEX IF NOT EXISTS product_makers_maker ON product_makers (maker_url);
+CREATE TABLE IF NOT EXISTS links (
+    maker_url TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (maker_url, platform)
+);
+"""
+
+
+def _value(value):
+    """None for missing / NaN cells, the value otherwise."""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return value
+
+
+def card_hash(row):
+    """Content hash of an archive card's text fields."""
+    text = "\x1f".join(str(_value(row.get(column)) or "") for column in HASHED_COLUMNS)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def vote_count(votes):
+    """Votes as an int ("1,234", "1.2K" and 56 all work), or None when unknown."""
+    match = re.match(r"\s*([\d.,]+)\s*([kK]?)", str(_value(votes) or ""))
+    if not match:
+        return None
+    number = match.group(1).replace(",", "")
+    try:
+        return int(float(number) * (1000 if match.group(2) else 1))
+    except ValueError:
+        return None
+
+
+def needs_refresh(card, state, max_age_days, vote_change):
+    """
+    Why a product must be scraped again, or None if its stored data can be carried forward.
+
+    card is the product's current archive row, state its scrape_state() entry
+    (None if never scraped). Returns "new", "changed" (card text differs),
+    "votes" (the vote count moved by more than vote_change, relative) or "stale"
+    (scraped more than max_age_days ago).
+    """
+    if state is None:
+        return "new"
+    scraped_hash, scraped_votes, scraped_at = state
+    if scraped_hash != card_hash(card):
+        return "changed"
+    before, now = vote_count(scraped_votes), vote_count(card.get("Votes"))
+    if before is not None and now is not None and abs(now - before) > vote_change * max(before, VOTE_CHANGE_FLOOR):
+        return "votes"
+    if time.time() - scraped_at > max_age_days * 86400:
+        return "stale"
+    return None
+
+
+def makers_from_row(row):
+    """[{name, link}] from a wide row's MakerN_Name / MakerN_Link columns, in N order."""
+    indexes = sorted({int(m.group(1)) for m in map(MAKER_COLUMN_RE.match, row) if m})
+    makers = []
+    for n in indexes:
+        link = _value(row.get(f"Maker{n}_Link"))
+        if isinstance(link, str) and link.startswith("http"):
+            makers.append({"name": _value(row.get(f"Maker{n}_Name")) or "", "link": link})
+    return makers
+
+
+class ResultStore:
+    """Not thread-safe: write from one thread (workers hand their results back first)."""
+
+    def __init__(self, path=RESULTS_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self._add_missing_columns()
+
+    def _add_missing_columns(self):
+        """Bring a store created by an older version up to SCHEMA."""
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(products)")}
+        with self.conn:
+            for column in ("card_hash", "scraped_hash", "scraped_votes"):
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE products ADD COLUMN {column} TEXT")
+
+    # === WRITES ===
+    def put_cards(self, rows):
+        """Upsert archive rows (Title, URL, Description, Tags, Votes, optional Date and other columns)."""
+        records = []
+        for row in rows:
+            extra = {
+                key: _value(value) for key, value in row.items()
+                if key not in CARD_COLUMNS and key not in ("Date", "Website") and not MAKER_COLUMN_RE.match(key)
+            }
+            votes = _value(row.get("Votes"))
+            records.append((
+                row["URL"], _value(row.get("Title")), _value(row.get("Description")), _value(row.get("Tags")),
+                None if votes is None else str(votes), _value(row.get("Date")),
+                json.dumps(extra, ensure_ascii=False) if extra else None, card_hash(row),
+            ))
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO products (url, title, description, tags, votes, day, extra, card_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    tags = excluded.tags,
+                    votes = excluded.votes,
+                    day = COALESCE(excluded.day, products.day),
+                    extra = COALESCE(excluded.extra, products.extra),
+                    card_hash = excluded.card_hash
+                """,
+                records,
+            )
+
+    def put_products(self, rows, scraped=True):
+        """
+        Store scraped product rows: website and ordered makers, from the product_row()
+        layout (Title, URL, Website, MakerN_Name, MakerN_Link).
+
+        A scraped product also records the card it was scraped from (store the
+        cards with put_cards() first). scraped=False imports rows from an earlier
+        stage's CSV without touching scraped_at or that card.
+        """
+        now = time.time() if scraped else None
+        with self.conn:
+            for row in rows:
+                url = row["URL"]
+                self.conn.execute(
+                    "INSERT INTO products (url, title) VALUES (?, ?) ON CONFLICT(url) DO NOTHING",
+                    (url, _value(row.get("Title"))),
+                )
+                self.conn.execute(
+                    """
+                    UPDATE products SET
+                        website = ?,
+                        scraped_at = COALESCE(?, scraped_at),
+                        scraped_hash = CASE WHEN ? THEN card_hash ELSE scraped_hash END,
+                        scraped_votes = CASE WHEN ? THEN votes ELSE scraped_votes END
+                    WHERE url = ?
+                    """,
+                    (_value(row.get("Website")), now, scraped, scraped, url),
+                )
+                self.conn.execute("DELETE FROM product_makers WHERE product_url = ?", (url,))
+                for position, maker in enumerate(makers_from_row(row), start=1):
+                    maker_url = canonical_profile_url(maker["link"])
+                    self.conn.execute(
+                        """
+                        INSERT INTO makers (url, name, link) VALUES (?, ?, ?)
+                        ON CONFLICT(url) DO UPDATE SET name = excluded.name
+                        """,
+                        (maker_url, maker["name"], maker["link"]),
+                    )
+                    self.conn.execute(
+                        "INSERT INTO product_makers (product_url, position, maker_url) VALUES (?, ?, ?)",
+                        (url, position, maker_url),
+                    )
+
+    def put_links(self, links_by_url):
+        """Replace the links of each maker in {profile URL: {platform: url}}."""
+        with self.conn:
+            for profile_url, links in links_by_url.items():
+                maker_url = canonical_profile_url(profile_url)
+                self.conn.execute("DELETE FROM links WHERE maker_url = ?", (maker_url,))
+                self.conn.executemany(
+                    "INSERT INTO links (maker_url, platform, url) VALUES (?, ?, ?)",
+                    [(maker_url, platform, url) for platform, url in links.items() if url],
+                )
+
+    # === READS ===
+    def scrape_state(self):
+        """{product url: (scraped_hash, scraped_votes, scraped_at)} for every product scraped so far."""
+        rows = self.conn.execute(
+            "SELECT url, scraped_hash, scraped_votes, scraped_at FROM products WHERE scraped_at IS NOT NULL"
+        )
+        return {url: (scraped_hash, scraped_votes, scraped_at) for url, scraped_hash, scraped_votes, scraped_at in rows}
+
+    def maker_urls(self, product_urls):
+        """Canonical profile URL of every maker of product_urls, one entry per (product, maker)."""
+        by_product = {}
+        rows = self.conn.execute("SELECT product_url, maker_url FROM product_makers ORDER BY product_url, position")
+        for product_url, maker_url in rows:
+            by_product.setdefault(product_url, []).append(maker_url)
+        return [url for product_url in product_urls for url in by_product.get(product_url, [])]
+
+    def export(self, product_urls=None, makers=False, links=False, platforms=None):
+        """
+        The wide CSV layout as a DataFrame: one row per product (in product_urls order if given).
+
+        A URL listed twice in product_urls gets one row per listing. makers=True
+        adds Website and MakerN_Name / MakerN_Link; links=True also adds
+        MakerN_<Platform> for every platform, right after each MakerN_Link.
+        """
+        products = pd.read_sql_query(
+            "SELECT url, title, description, tags, votes, day, extra, website, scraped_at FROM products",
+            self.conn,
+        ).set_index("url")
+        order = None
+        if product_urls is not None:
+            # The joins below need unique URLs; the listing order is restored at the end
+            order = pd.Index(list(product_urls))
+            products = products.reindex(order.unique())
+
+        df = pd.DataFrame({
+            "Title": products["title"],
+            "URL": products.index,
+            "Description": products["description"],
+            "Tags": products["tags"],
+            "Votes": products["votes"],
+        }, index=products.index)
+        if products["day"].notna().any():
+            df.insert(0, "Date", products["day"])
+        extra = products["extra"].dropna()
+        if not extra.empty:
+            extra_df = pd.DataFrame([json.loads(e) for e in extra], index=extra.index)
+            df = df.join(extra_df.drop(columns=[c for c in extra_df.columns if c in df.columns]))
+        if makers:
+            df["Website"] = products["website"]
+            wide = self._maker_columns(links, platforms)
+            if not wide.empty:
+                df = df.join(wide)
+        if order is not None:
+            df = df.take(df.index.get_indexer(order))
+        return df.reset_index(drop=True)
+
+    def _maker_columns(self, links, platforms):
+        """MakerN_* columns indexed by product URL."""
+        makers = pd.read_sql_query(
+            """
+            SELECT pm.product_url, pm.position, m.name, m.link, m.url AS maker_url
+            FROM product_makers pm JOIN makers m ON m.url = pm.maker_url
+            """,
+            self.conn,
+        )
+        if makers.empty:
+            return pd.DataFrame()
+        wide = makers.pivot(index="product_url", columns="position", values=["name", "link"])
+        positions = sorted(makers["position"].unique())
+
+        if links:
+            platforms = platforms or SOCIAL_PLATFORMS
+            link_rows = pd.read_sql_query(
+                """
+                SELECT pm.product_url, pm.position, l.platform, l.url
+                FROM product_makers pm JOIN links l ON l.maker_url = pm.maker_url
+                """,
+                self.conn,
+            )
+            social = link_rows.pivot_table(
+                index="product_url", columns=["position", "platform"], values="url", aggfunc="first"
+            ) if not link_rows.empty else pd.DataFrame(index=wide.index)
+
+        columns = {}
+        for n in positions:
+            columns[f"Maker{n}_Name"] = wide[("name", n)]
+            columns[f"Maker{n}_Link"] = wide[("link", n)]
+            if links:
+                has_maker = wide[("link", n)].notna()
+                for platform in platforms:
+                    values = social[(n, platform)] if (n, platform) in social.columns else pd.Series(dtype=object)
+                    # Every listed maker gets every platform column, "" where the profile had none
+                    columns[f"Maker{n}_{platform}"] = values.reindex(wide.index).fillna("").where(has_maker)
+        return pd.DataFrame(columns, index=wide.index)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,156 @@
+"""
+retry_scheduler.py
+Delayed retries with exponential backoff, and a circuit breaker, for the driver pools.
+
+A failed item is not retried on the spot. It goes to a delayed queue and is
+due again after BACKOFF_BASE * 2**(attempt - 1) seconds (capped at
+BACKOFF_MAX, with random jitter so workers do not retry in lockstep), while
+the workers carry on with other items.
+
+Every outcome is also reported to one process-wide circuit breaker. When most
+of the recent attempts failed (Product Hunt serving verification pages, the
+network gone), the breaker opens and every worker pauses for a cooldown
+instead of burning through the input list. Back-to-back trips double the
+cooldown; after BREAKER_MAX_TRIPS of them the run is abandoned, and the
+unfinished items can be picked up later with --resume.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+
+# === CONFIG ===
+MAX_ATTEMPTS = 3  # attempts per item, including the first
+BACKOFF_BASE = 5  # seconds before the first retry
+BACKOFF_MAX = 120  # longest delay between two attempts
+BACKOFF_JITTER = 0.5  # each delay varies by up to ±50%
+BREAKER_WINDOW = 20  # recent outcomes the failure rate is computed over
+BREAKER_MIN_CALLS = 8  # never trip on fewer outcomes than this
+BREAKER_FAILURE_RATE = 0.6  # trip when at least this share of the window failed
+BREAKER_COOLDOWN = 120  # seconds every worker pauses on the first trip
+BREAKER_MAX_COOLDOWN = 900
+BREAKER_MAX_TRIPS = 4  # trips without a success in between before the run is abandoned
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX, jitter=BACKOFF_JITTER):
+    """Seconds to wait after failed attempt number `attempt` (1 = the first try)."""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+class CircuitBreaker:
+    def __init__(self, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS, failure_rate=BREAKER_FAILURE_RATE,
+                 cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN, max_trips=BREAKER_MAX_TRIPS):
+        self.lock = threading.Lock()
+        self.outcomes = deque(maxlen=window)
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_trips = max_trips
+        self.open_until = 0.0
+        self.trips = 0  # since the last success
+        self.total_trips = 0
+        self.aborted = False
+
+    def record(self, ok):
+        with self.lock:
+            if ok:
+                self.trips = 0
+            self.outcomes.append(ok)
+            if self.aborted or time.monotonic() < self.open_until:
+                return
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= self.min_calls and failures >= self.failure_rate * len(self.outcomes):
+                self._trip(failures)
+
+    def _trip(self, failures):
+        calls = len(self.outcomes)
+        self.outcomes.clear()
+        self.trips += 1
+        self.total_trips += 1
+        if self.trips > self.max_trips:
+            self.aborted = True
+            print(f"⛔ Circuit breaker tripped {self.trips} times in a row — abandoning the run. Re-run with --resume later.")
+            return
+        cooldown = min(self.max_cooldown, self.cooldown * 2 ** (self.trips - 1))
+        self.open_until = time.monotonic() + cooldown
+        print(f"⚠️ Circuit breaker open: {failures}/{calls} recent attempts failed. Pausing all workers for {cooldown:.0f}s.")
+
+    def wait(self):
+        """Block while the breaker is open; returns False once the run has been abandoned."""
+        while True:
+            with self.lock:
+                if self.aborted:
+                    return False
+                remaining = self.open_until - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, 5))
+
+    def reset(self):
+        with self.lock:
+            self.outcomes.clear()
+            self.open_until = 0.0
+            self.trips = 0
+            self.aborted = False
+
+
+BREAKER = CircuitBreaker()
+
+
+class RetryScheduler:
+    """Work queue for one pool run: ready items, a delayed retry heap and the in-flight count."""
+
+    def __init__(self, items, max_attempts=MAX_ATTEMPTS, breaker=BREAKER):
+        self.cond = threading.Condition()
+        self.ready = deque((index, item, 1) for index, item in enumerate(items))
+        self.delayed = []  # heap of (due, seq, index, item, attempt)
+        self.seq = itertools.count()  # tie-breaker, so items themselves are never compared
+        self.in_flight = 0
+        self.max_attempts = max_attempts
+        self.breaker = breaker
+
+    def get(self):
+        """
+        Next (index, item, attempt) to work on, waiting for retries that are not due yet.
+
+        Returns None when nothing is left, or when the breaker abandoned the run.
+        """
+        while True:
+            if not self.breaker.wait():
+                return None
+            with self.cond:
+                now = time.monotonic()
+                while self.delayed and self.delayed[0][0] <= now:
+                    _, _, index, item, attempt = heapq.heappop(self.delayed)
+                    self.ready.append((index, item, attempt))
+                if self.ready:
+                    self.in_flight += 1
+                    return self.ready.popleft()
+                if not self.delayed and not self.in_flight:
+                    return None
+                # An in-flight item may still fail and come back; recheck at least every few seconds
+                due_in = self.delayed[0][0] - now if self.delayed else 5
+                self.cond.wait(min(due_in, 5))
+
+    def succeeded(self):
+        self.breaker.record(True)
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def failed(self, index, item, attempt):
+        """Queue the item for a later attempt; returns the delay, or None if it is out of attempts."""
+        self.breaker.record(False)
+        delay = None
+        with self.cond:
+            self.in_flight -= 1
+            if attempt < self.max_attempts:
+                delay = backoff_delay(attempt)
+                heapq.heappush(self.delayed, (time.monotonic() + delay, next(self.seq), index, item, attempt + 1))
+            self.cond.notify_all()
+        return delay
@@ -1,5 +1,8 @@
+import argparse
 import subprocess
 
+import pipeline
+
 # List of scripts to run sequentially
 scripts = [
     "archive_scraper.py",
@@ -7,6 +10,33 @@ scripts = [
     "profile_scraper.py"
 ]
 
-for script in scripts:
-    print(f"\n=== Running {script} ===\n")
-    subprocess.run(["python", script], check=True)
+parser = argparse.ArgumentParser(description="Run the full Product Hunt scraping pipeline.")
+parser.add_argument(
+    "--sequential",
+    action="store_true",
+    help="run the three scripts one after another instead of the streaming in-process pipeline",
+)
+parser.add_argument(
+    "--refresh",
+    action="store_true",
+    help="only re-scrape products that are new, changed or stale since the last run",
+)
+parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="continue an interrupted run: products and profiles already journaled are not scraped again",
+)
+args = parser.parse_args()
+
+if args.sequential:
+    for script in scripts:
+        print(f"\n=== Running {script} ===\n")
+        command = ["python", script]
+        if args.refresh and script == "product_scraper.py":
+            command.append("--refresh")
+        if args.resume and script != "archive_scraper.py":
+            command.append("--resume")
+        subprocess.run(command, check=True)
+else:
+    print("\n=== Running streaming pipeline ===\n")
+    pipeline.main(refresh=args.refresh, resume=args.resume)
@@ -0,0 +1,247 @@
+"""
+snapshot_parser.py
+Offline parsing of saved Product Hunt pages.
+
+The scrapers can store one gzip-compressed `driver.page_source` snapshot per
+page under SNAPSHOT_DIR/<stage>/ and extract data from it with lxml, using
+the same selectors as the live Selenium code. Extraction can then be re-run
+(or fixed) against the stored pages without touching the network:
+
+    python snapshot_parser.py archive   # -> output1.csv
+    python snapshot_parser.py product   # -> website + makers per product URL
+    python snapshot_parser.py profile   # -> social links per profile URL
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin
+
+import lxml.html
+
+from embedded_state import extract_product, extract_profile_hrefs
+from link_engine import classify_links
+
+# === CONFIG ===
+SNAPSHOT_DIR = "snapshots"
+BASE_URL = "https://www.producthunt.com"
+PARSE_WORKERS = 4
+
+STAGES = ("archive", "product", "team", "profile")
+
+
+# === STORAGE ===
+def snapshot_path(stage, url):
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+    return os.path.join(SNAPSHOT_DIR, stage, f"{digest}.html.gz")
+
+
+def save_snapshot(stage, url, html):
+    """Store html for url; the URL is kept on the first line so files are self-describing."""
+    path = snapshot_path(stage, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        f.write(f"<!-- snapshot-url: {url} -->\n")
+        f.write(html)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot(path):
+    """Return (url, html) for a stored snapshot."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        first_line = f.readline()
+        html = f.read()
+    url = first_line.strip().removeprefix("<!-- snapshot-url: ").removesuffix(" -->")
+    return url, html
+
+
+def iter_snapshots(stage):
+    stage_dir = os.path.join(SNAPSHOT_DIR, stage)
+    if not os.path.isdir(stage_dir):
+        return
+    for name in sorted(os.listdir(stage_dir)):
+        if name.endswith(".html.gz"):
+            yield os.path.join(stage_dir, name)
+
+
+# === PARSING ===
+def has_class(*classes):
+    """XPath predicate equivalent to the CSS selector `.cls1.cls2`."""
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in classes)
+
+
+def first_text(root, xpath):
+    found = root.xpath(xpath)
+    return found[0].text_content().strip() if found else None
+
+
+def to_tree(html):
+    return lxml.html.fromstring(html) if html else None
+
+
+def parse_archive_cards(html, base_url=BASE_URL):
+    """Same fields as archive_scraper.extract_cards()."""
+    tree = to_tree(html)
+    if tree is None:
+        return []
+
+    products = []
+    for card in tree.xpath("//section[starts-with(@data-test, 'post-item-')]"):
+        if not card.xpath(".//button[@data-test='vote-button']"):
+            continue
+        name_elems = card.xpath(".//div[starts-with(@data-test, 'post-name-')]//a")
+        if not name_elems:
+            continue
+        tags = [t.text_content().strip() for t in card.xpath(".//div[@data-sentry-component='TagList']//a")]
+        products.append({
+            "Title": name_elems[0].text_content().strip(),
+            "URL": urljoin(base_url, name_elems[0].get("href", "")),
+            "Description": first_text(card, f".//div[{has_class('text-16', 'font-normal')}]") or "",
+            "Tags": ", ".join(tags),
+            "Votes": first_text(card, ".//button[@data-test='vote-button']//p") or "0",
+        })
+    return products
+
+
+def parse_company_website(html):
+    """Same rules as product_scraper.get_company_website()."""
+    tree = to_tree(html)
+    if tree is None:
+        return None
+
+    for sec in tree.xpath("//div[@data-sentry-component='Status']"):
+        header = first_text(sec, f".//div[{has_class('text-lg', 'font-semibold')}]")
+        if not header or "Company Info" not in header:
+            continue
+        for a in sec.xpath(".//a"):
+            href = a.get("href")
+            if href and "producthunt.com" not in href and not href.startswith("/") and a.text_content().strip():
+                return href
+    return None
+
+
+def parse_maker_candidates(html, base_url=BASE_URL):
+    """Every maker card on a Team page as {name, role, link}."""
+    tree = to_tree(html)
+    if tree is None:
+        return []
+
+    candidates = []
+    for card in tree.xpath("//section[starts-with(@data-test, 'maker-card-')]"):
+        name_elems = card.xpath(f".//a[{has_class('text-16', 'font-semibold')}]")
+        role = first_text(card, f".//a[{has_class('text-14', 'font-normal')}]")
+        if not name_elems or role is None:
+            continue
+        candidates.append({
+            "name": name_elems[0].text_content().strip(),
+            "role": role,
+            "link": urljoin(base_url, name_elems[0].get("href", "")),
+        })
+    return candidates
+
+
+def parse_team_url(html, base_url=BASE_URL):
+    """Absolute URL of the product's Team tab, or None."""
+    tree = to_tree(html)
+    if tree is None:
+        return None
+    hrefs = tree.xpath("//a[@data-test='product-navigation-item-team']/@href")
+    return urljoin(base_url, hrefs[0]) if hrefs else None
+
+
+def parse_product_page(overview_html, team_html, product_url=""):
+    """Website from the overview page and selected makers from the Team page."""
+    # Imported here: the scraper modules import this one
+    from product_scraper import select_makers
+
+    # Embedded JSON state first, rendered DOM as the fallback
+    for html in (overview_html, team_html):
+        state = extract_product(html, product_url)
+        if state and state["makers"]:
+            return {"website": state["website"], "makers": select_makers(state["makers"])}
+
+    return {
+        "website": parse_company_website(overview_html),
+        "makers": select_makers(parse_maker_candidates(team_html)),
+    }
+
+
+def parse_profile_hrefs(html, profile_url="", base_url=BASE_URL, strict=False):
+    """
+    Every href of a profile's links: from embedded state, else from the Links section.
+
+    With strict=True, a page with neither embedded state nor a Links section
+    returns None instead of [] (raw HTTP responses may simply be unrendered).
+    """
+    hrefs = extract_profile_hrefs(html, profile_url)
+    if hrefs is not None:
+        return hrefs
+
+    empty = None if strict else []
+    tree = to_tree(html)
+    if tree is None:
+        return empty
+    sections = tree.xpath("//h2[text()='Links']/following-sibling::div")
+    if not sections:
+        return empty
+    return [urljoin(base_url, a.get("href", "")) for a in sections[0].xpath(".//a")]
+
+
+def parse_profile_links(html, profile_url="", base_url=BASE_URL, strict=False):
+    """Same rules as profile_scraper.extract_links_from_section(); None only as in parse_profile_hrefs."""
+    hrefs = parse_profile_hrefs(html, profile_url, base_url, strict)
+    return None if hrefs is None else classify_links(hrefs)
+
+
+# === RE-RUN ===
+def parse_snapshot_file(stage, path):
+    """Parse one stored snapshot; returns (url, data)."""
+    url, html = load_snapshot(path)
+    if stage == "archive":
+        return url, parse_archive_cards(html)
+    if stage == "product":
+        team_path = snapshot_path("team", url)
+        team_html = load_snapshot(team_path)[1] if os.path.exists(team_path) else ""
+        return url, parse_product_page(html, team_html, url)
+    if stage == "profile":
+        return url, parse_profile_links(html, url)
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def reparse(stage, workers=PARSE_WORKERS):
+    """Parse every stored snapshot of a stage in a process pool; returns {url: data}."""
+    paths = list(iter_snapshots(stage))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(parse_snapshot_file, [stage] * len(paths), paths, chunksize=16)
+        return dict(results)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("archive", "product", "profile"):
+        print("Usage: python snapshot_parser.py archive|product|profile")
+        sys.exit(1)
+
+    stage = sys.argv[1]
+    results = reparse(stage)
+    print(f"Parsed {len(results)} '{stage}' snapshots from '{SNAPSHOT_DIR}'.")
+
+    if stage == "archive":
+        import pandas as pd
+
+        products = [p for cards in results.values() for p in cards]
+        pd.DataFrame(products).to_csv("output1.csv", index=False)
+        print(f"Saved {len(products)} products to 'output1.csv'.")
+    else:
+        out_path = f"snapshots_{stage}.json"
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Saved results to '{out_path}'.")
+
+
+if __name__ == "__main__":
+    main()
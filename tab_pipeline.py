@@ -0,0 +1,99 @@
+"""
+tab_pipeline.py
+Keep several pages loading at once in one Chrome instance.
+
+driver.get() blocks until a page has loaded, and the scraper then waits for
+it to render while the browser has nothing else to do. run_tabs() opens K tabs
+instead, starts a navigation in each without waiting for it (location.href),
+and visits the tabs round-robin: a tab whose page is ready is harvested and
+sent straight to the next URL, so K pages are always loading or rendering
+side by side. Build the driver with background_tabs=True so Chrome does not
+throttle the tabs that are not in front.
+"""
+
+import time
+from collections import deque
+
+from selenium.common.exceptions import TimeoutException
+
+import driver_factory
+import metrics
+
+# === CONFIG ===
+READY_TIMEOUT = 30  # seconds a page may take to become ready before its job fails
+IDLE_POLL = 0.1  # pause after a round in which no tab was ready
+
+# The old document is marked before navigating, so it is never mistaken for the new one
+NAVIGATE_JS = "window.__tabLeaving = true; window.location.href = arguments[0];"
+READY_JS = "return !window.__tabLeaving && document.readyState !== 'loading' && !!({condition});"
+
+
+def open_tabs(driver, count):
+    """Window handles of `count` tabs: the current one plus count - 1 new ones."""
+    handles = [driver.current_window_handle]
+    for _ in range(count - 1):
+        driver.switch_to.new_window("tab")
+        handles.append(driver.current_window_handle)
+    return handles
+
+
+def close_tabs(driver, handles):
+    """Close every tab but the first and switch back to it."""
+    for handle in handles[1:]:
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except Exception:
+            pass
+    driver.switch_to.window(handles[0])
+
+
+def run_tabs(driver, jobs, harvest, tabs, ready=None, timeout=READY_TIMEOUT):
+    """
+    Load every (key, url) job in `tabs` tabs of driver and call harvest(driver, key, url) on each page.
+
+    ready(key) may give a JS expression that must also be true before the page
+    is harvested (e.g. the elements it reads have rendered). harvest may return
+    more (key, url) jobs, which join the queue. Returns {key: exception} for the
+    jobs that timed out or whose harvest raised.
+    """
+    stage = getattr(driver, "stage", None)
+    queue = deque(jobs)
+    failed = {}
+    handles = open_tabs(driver, max(1, tabs))
+    slots = [None] * len(handles)  # (key, url, started) of the page loading in each tab
+    try:
+        while queue or any(slots):
+            harvested = False
+            for n, handle in enumerate(handles):
+                if slots[n] is None and not queue:
+                    continue
+                driver.switch_to.window(handle)
+                if slots[n] is not None:
+                    key, url, started = slots[n]
+                    condition = (ready(key) if ready else None) or "true"
+                    if not driver.execute_script(READY_JS.format(condition=condition)):
+                        if time.monotonic() - started < timeout:
+                            continue  # still loading; look at the next tab
+                        metrics.count(stage, "timeout")
+                        failed[key] = TimeoutException(f"{url} was not ready after {timeout}s")
+                    else:
+                        metrics.observe(stage, "navigate", time.monotonic() - started)
+                        try:
+                            queue.extend(harvest(driver, key, url) or [])
+                        except Exception as e:
+                            failed[key] = e
+                        if getattr(driver, "lean", False) or getattr(driver, "capture", False):
+                            # Nobody calls load_page() here; keep the performance log from piling up
+                            driver_factory.read_network_log(driver)
+                    slots[n] = None
+                    harvested = True
+                if queue:
+                    key, url = queue.popleft()
+                    driver.execute_script(NAVIGATE_JS, url)
+                    slots[n] = (key, url, time.monotonic())
+            if not harvested:
+                time.sleep(IDLE_POLL)
+    finally:
+        close_tabs(driver, handles)
+    return failed
@@ -0,0 +1,80 @@
+"""
+Embedded-state extractors against saved pages and recorded API responses in tests/fixtures.
+
+    python -m unittest discover tests
+"""
+
+import os
+import unittest
+
+import embedded_state
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+PRODUCT_URL = "https://www.producthunt.com/products/acme-notes"
+PROFILE_URL = "https://www.producthunt.com/@ada"
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class ExtractProductTest(unittest.TestCase):
+    def setUp(self):
+        self.html = fixture("product_page.html")
+
+    def test_website_and_makers(self):
+        product = embedded_state.extract_product(self.html, PRODUCT_URL)
+        self.assertEqual(product["website"], "https://acme-notes.example?ref=producthunt")
+        self.assertEqual(product["makers"], [
+            {"name": "Ada Maker", "role": "Founder & CEO", "link": "https://www.producthunt.com/@ada"},
+            {"name": "Ben Builder", "role": "CTO", "link": "https://www.producthunt.com/@ben"},
+        ])
+
+    def test_unmatched_slug_does_not_take_a_related_product(self):
+        # Product:2 on the same page carries makers too; the DOM must decide instead
+        self.assertIsNone(embedded_state.extract_product(self.html, "https://www.producthunt.com/products/unknown"))
+
+    def test_page_without_state(self):
+        self.assertIsNone(embedded_state.extract_product("<html><body>Just a moment...</body></html>", PRODUCT_URL))
+
+
+class ExtractProfileLinksTest(unittest.TestCase):
+    def test_links_are_classified_and_canonical(self):
+        links = embedded_state.extract_profile_links(fixture("profile_page.html"), PROFILE_URL)
+        self.assertEqual(links, {
+            "Linkedin": "https://www.linkedin.com/in/ada-maker",
+            "GitHub": "https://github.com/ada",
+            "Website": "https://ada.example/",
+            "Twitter": "https://twitter.com/ada_makes",
+        })
+
+    def test_other_user(self):
+        html = fixture("profile_page.html")
+        self.assertIsNone(embedded_state.extract_profile_links(html, "https://www.producthunt.com/@someone"))
+
+
+class DecodeResponsesTest(unittest.TestCase):
+    def test_recorded_responses(self):
+        # Post 2 is sent twice, one body is not JSON and the last line was cut short by a crash
+        bodies = embedded_state.load_captures(os.path.join(FIXTURES, "archive_responses.jsonl"))
+        self.assertEqual(len(bodies), 3)
+        records = embedded_state.decode_responses(bodies)
+        self.assertEqual([r["Title"] for r in records], ["First Launch", "Second Launch", "Third Launch"])
+        self.assertEqual(records[1], {
+            "Title": "Second Launch",
+            "URL": "https://www.producthunt.com/products/post-2",
+            "Description": "Tagline 2",
+            "Tags": "Productivity",
+            "Votes": "102",
+            "Makers": "Ben, Cy",
+        })
+        self.assertEqual(records[2]["Makers"], "")
+
+    def test_without_makers(self):
+        bodies = embedded_state.load_captures(os.path.join(FIXTURES, "archive_responses.jsonl"))
+        self.assertNotIn("Makers", embedded_state.decode_responses(bodies, makers=False)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,409 @@
+"""
+work_queue.py
+Shared work queue for running the product and profile stages on several machines.
+
+The queue is a SQLite file (QUEUE_DB) that every node can open: a shared disk,
+or a plain local file when all nodes run on one machine. Work is handed out
+in leases. A node leases a batch of URLs, renews its leases with heartbeats
+while it scrapes them and writes each result back. A lease that is not renewed
+within LEASE_SECONDS (the node crashed or lost the share) expires and its URLs
+go back to the queue; results from a node that lost its lease are ignored, so
+no URL is worked on by two nodes at once.
+
+The coordinator seeds the queue from INPUT_CSV, waits for the product tasks,
+seeds one profile task per maker that is not in the profile cache, waits
+again and writes output2.csv and the final CSV from the result store:
+
+    python work_queue.py coordinator [--resume] [--refresh]
+    python work_queue.py worker [--node NAME]     # on every scraping machine
+    python work_queue.py status
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+
+import pandas as pd
+
+import metrics
+import product_scraper
+import profile_scraper
+from link_engine import canonicalize
+from profile_cache import ProfileCache
+from result_store import ResultStore
+from retry_scheduler import BREAKER, BREAKER_MAX_COOLDOWN
+
+# === CONFIG ===
+QUEUE_DB = "work_queue.sqlite"  # put this on storage every node can reach
+LEASE_SECONDS = 600  # a lease not renewed for this long goes back to the queue
+HEARTBEAT_SECONDS = 60  # how often a busy node renews its leases
+BATCH_SIZE = {"product": 40, "profile": 100}  # URLs leased at a time
+MAX_ATTEMPTS = 3  # leases per task before it is marked failed
+POLL_SECONDS = 15  # idle workers and the waiting coordinator check the queue this often
+ABORT_BACKOFF_SECONDS = BREAKER_MAX_COOLDOWN  # a worker whose circuit breaker gave up idles this long before leasing again
+
+KINDS = ("product", "profile")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (kind, state);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+# Expired leases go back to the queue, or are marked failed after max_attempts
+EXPIRE_SQL = """
+UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, owner = NULL
+WHERE state = 'leased' AND lease_expires < ?
+"""
+
+
+class WorkQueue:
+    """One connection per thread: open another WorkQueue for a background thread."""
+
+    def __init__(self, path=QUEUE_DB, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit; every write below runs in its own BEGIN IMMEDIATE transaction
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+
+    def _write(self, sql, params=()):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = self.conn.execute(sql, params)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return cur.rowcount
+
+    # === COORDINATOR ===
+    def enqueue(self, kind, payloads):
+        """Add {key: payload} tasks; keys already queued (done or not) are left as they are."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (kind, key, payload) VALUES (?, ?, ?)",
+                [(kind, key, json.dumps(payload, ensure_ascii=False)) for key, payload in payloads.items()],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def clear(self, kind):
+        self._write("DELETE FROM tasks WHERE kind = ?", (kind,))
+
+    def set_closed(self, closed):
+        """Closing the run tells the workers to exit once they are idle."""
+        self._write(
+            "INSERT INTO meta (name, value) VALUES ('closed', ?) ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            ("1" if closed else "0",),
+        )
+
+    def is_closed(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'closed'").fetchone()
+        return bool(row) and row[0] == "1"
+
+    def requeue_expired(self):
+        """Return expired leases to the queue (or mark them failed after max_attempts); returns how many."""
+        return self._write(EXPIRE_SQL, (self.max_attempts, time.time()))
+
+    def stats(self, kind):
+        counts = dict.fromkeys(("pending", "leased", "done", "failed"), 0)
+        for state, n in self.conn.execute("SELECT state, COUNT(*) FROM tasks WHERE kind = ? GROUP BY state", (kind,)):
+            counts[state] = n
+        return counts
+
+    def results(self, kind):
+        """{key: result} of every finished task of kind."""
+        rows = self.conn.execute("SELECT key, result FROM tasks WHERE kind = ? AND state = 'done'", (kind,))
+        return {key: json.loads(result) for key, result in rows}
+
+    # === WORKERS ===
+    def lease(self, kind, owner, limit):
+        """Lease up to limit pending tasks of kind to owner; returns {key: payload}."""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(EXPIRE_SQL, (self.max_attempts, now))
+            rows = self.conn.execute(
+                "SELECT key, payload FROM tasks WHERE kind = ? AND state = 'pending' ORDER BY rowid LIMIT ?",
+                (kind, limit),
+            ).fetchall()
+            self.conn.executemany(
+                """
+                UPDATE tasks SET state = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE kind = ? AND key = ?
+                """,
+                [(owner, now + self.lease_seconds, kind, key) for key, _ in rows],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return {key: json.loads(payload) for key, payload in rows}
+
+    def heartbeat(self, owner):
+        """Extend every lease held by owner; returns how many are still held."""
+        return self._write(
+            "UPDATE tasks SET lease_expires = ? WHERE state = 'leased' AND owner = ?",
+            (time.time() + self.lease_seconds, owner),
+        )
+
+    def complete(self, kind, owner, results):
+        """Store {key: result} for tasks owner still leases; returns how many were accepted."""
+        accepted = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, result in results.items():
+                cur = self.conn.execute(
+                    """
+                    UPDATE tasks SET state = 'done', result = ?, owner = NULL
+                    WHERE kind = ? AND key = ? AND state = 'leased' AND owner = ?
+                    """,
+                    (json.dumps(result, ensure_ascii=False), kind, key, owner),
+                )
+                accepted += cur.rowcount
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return accepted
+
+    def release(self, kind, owner, keys, refund=False):
+        """
+        Give failed tasks back to the queue (or mark them failed after max_attempts).
+
+        refund=True hands the lease's attempt back, for tasks that were never
+        really tried (the worker's circuit breaker had abandoned the batch).
+        """
+        refunded = 1 if refund else 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                """
+                UPDATE tasks SET state = CASE WHEN attempts - ? >= ? THEN 'failed' ELSE 'pending' END,
+                    attempts = attempts - ?, owner = NULL
+                WHERE kind = ? AND key = ? AND state = 'leased' AND owner = ?
+                """,
+                [(refunded, self.max_attempts, refunded, kind, key, owner) for key in keys],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        self.conn.close()
+
+
+class Heartbeat:
+    """Renew owner's leases every `interval` seconds from a background thread while the block runs."""
+
+    def __init__(self, owner, path=QUEUE_DB, interval=HEARTBEAT_SECONDS):
+        self.owner = owner
+        self.path = path
+        self.interval = interval
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        queue = WorkQueue(self.path)
+        try:
+            while not self.stop.wait(self.interval):
+                try:
+                    if not queue.heartbeat(self.owner):
+                        print(f"[{self.owner}] ⚠️ No leases left to renew — they expired and went back to the queue.")
+                except sqlite3.Error as e:
+                    print(f"[{self.owner}] Heartbeat failed:", e)
+        finally:
+            queue.close()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+
+# === SCRAPING ===
+def scrape_product_batch(batch):
+    """{product url: product row or None} for a leased {url: [title, url]} batch."""
+    rows = [tuple(payload) for payload in batch.values()]
+    return dict(zip(batch, product_scraper.scrape_products(rows)))
+
+
+def scrape_profile_batch(batch):
+    """{profile url: links or None} for a leased {url: url} batch."""
+    links_by_url = profile_scraper.fetch_profiles(list(batch))
+    return {url: links_by_url.get(url) for url in batch}
+
+
+SCRAPERS = {"product": scrape_product_batch, "profile": scrape_profile_batch}
+
+
+def worker(node=None, path=QUEUE_DB):
+    """Lease, scrape and write back batches until the coordinator closes the run."""
+    node = node or f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(path)
+    print(f"[{node}] Worker started on '{path}'.")
+    try:
+        while not queue.is_closed():
+            # Products first: the profile tasks are seeded from their results
+            batch = {}
+            for kind in KINDS:
+                batch = queue.lease(kind, node, BATCH_SIZE[kind])
+                if batch:
+                    break
+            if not batch:
+                time.sleep(POLL_SECONDS)
+                continue
+
+            print(f"[{node}] Leased {len(batch)} {kind} tasks.")
+            with Heartbeat(node, path):
+                try:
+                    results = SCRAPERS[kind](batch)
+                except Exception as exc:
+                    print(f"[{node}] ERROR:", exc)
+                    traceback.print_exc()
+                    results = {}
+            done = {key: result for key, result in results.items() if result is not None}
+            accepted = queue.complete(kind, node, done)
+            # The breaker is process-wide: once it gives up, every later batch would fail unscraped
+            abandoned = BREAKER.aborted
+            queue.release(kind, node, [key for key in batch if key not in done], refund=abandoned)
+            print(f"[{node}] {accepted}/{len(batch)} {kind} tasks done ({len(done) - accepted} lost their lease).")
+            if abandoned:
+                print(f"[{node}] Circuit breaker gave up — tasks returned to the queue, backing off {ABORT_BACKOFF_SECONDS}s.")
+                time.sleep(ABORT_BACKOFF_SECONDS)
+                BREAKER.reset()
+        print(f"[{node}] Run closed by the coordinator — exiting.")
+    finally:
+        queue.close()
+        metrics.write_reports(f"worker_{node}")
+
+
+# === COORDINATOR ===
+def wait_for(queue, kind):
+    """Block until no task of kind is pending or leased, requeueing expired leases meanwhile."""
+    while True:
+        requeued = queue.requeue_expired()
+        if requeued:
+            print(f"{requeued} expired leases went back to the queue.")
+        counts = queue.stats(kind)
+        print(f"[{kind}] {counts['done']} done, {counts['leased']} leased, {counts['pending']} pending, {counts['failed']} failed")
+        if not counts["pending"] and not counts["leased"]:
+            return counts
+        time.sleep(POLL_SECONDS)
+
+
+def coordinator(path=QUEUE_DB, resume=False, refresh=False):
+    """Seed the queue from product_scraper.INPUT_CSV, wait for the workers and export the results."""
+    df = pd.read_csv(product_scraper.INPUT_CSV)
+    df["URL"] = canonicalize(df["URL"])
+    print(f"Loaded {len(df)} products from '{product_scraper.INPUT_CSV}'")
+
+    queue = WorkQueue(path)
+    store = ResultStore(product_scraper.RESULTS_DB)
+    cache = ProfileCache(profile_scraper.CACHE_DB, ttl_days=profile_scraper.CACHE_TTL_DAYS)
+    try:
+        if not resume:
+            for kind in KINDS:
+                queue.clear(kind)
+        queue.set_closed(False)
+
+        cards = df.to_dict("records")
+        store.put_cards(cards)
+        rows = list(dict.fromkeys(zip(df["Title"], df["URL"])))
+        if refresh:
+            by_row = {}
+            for card in cards:
+                by_row.setdefault((card["Title"], card["URL"]), card)
+            rows = product_scraper.refresh_plan(store, by_row)
+        queue.enqueue("product", {url: [title, url] for title, url in rows})
+        print(f"Queued {len(rows)} products in '{path}'. Start workers with: python work_queue.py worker")
+        wait_for(queue, "product")
+        store.put_products(queue.results("product").values())
+        store.export(df["URL"], makers=True).to_csv(product_scraper.OUTPUT_CSV, index=False)
+        print(f"Saved '{product_scraper.OUTPUT_CSV}'.")
+
+        # One profile task per distinct maker the cache cannot answer
+        maker_urls = list(dict.fromkeys(store.maker_urls(df["URL"])))
+        links_by_url = {}
+        to_fetch = []
+        for url in maker_urls:
+            cached = cache.get(url)
+            if cached is None:
+                to_fetch.append(url)
+            else:
+                links_by_url[url] = cached
+        queue.enqueue("profile", {url: url for url in to_fetch})
+        print(f"{len(maker_urls)} distinct makers, {len(to_fetch)} queued for scraping ({cache.stats()}).")
+        wait_for(queue, "profile")
+        for url, links in queue.results("profile").items():
+            cache.put(url, links)
+            links_by_url[url] = links
+
+        store.put_links(links_by_url)
+        df_out = store.export(df["URL"], makers=True, links=True)
+        df_out.to_csv(profile_scraper.OUTPUT_CSV, index=False)
+        print(f"\n✅ Distributed run complete. Saved {len(df_out)} products to '{profile_scraper.OUTPUT_CSV}'")
+        queue.set_closed(True)
+    finally:
+        queue.close()
+        cache.close()
+        store.close()
+
+
+def status(path=QUEUE_DB):
+    queue = WorkQueue(path)
+    try:
+        print(f"Run {'closed' if queue.is_closed() else 'open'}.")
+        for kind in KINDS:
+            counts = queue.stats(kind)
+            print(f"[{kind}] " + ", ".join(f"{state}: {n}" for state, n in counts.items()))
+        leases = queue.conn.execute(
+            "SELECT owner, COUNT(*), MAX(lease_expires) FROM tasks WHERE state = 'leased' GROUP BY owner"
+        ).fetchall()
+        for owner, n, expires in leases:
+            print(f"  {owner}: {n} leased, expires in {expires - time.time():.0f}s")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spread the product and profile stages over several machines.")
+    parser.add_argument("mode", choices=["coordinator", "worker", "status"])
+    parser.add_argument("--queue", default=QUEUE_DB, help="path of the shared queue database")
+    parser.add_argument("--node", help="worker name shown in leases (default: host-pid)")
+    parser.add_argument("--resume", action="store_true", help="coordinator: keep tasks finished by an earlier run")
+    parser.add_argument("--refresh", action="store_true", help="coordinator: only queue new, changed or stale products")
+    args = parser.parse_args()
+    if args.mode == "coordinator":
+        coordinator(args.queue, resume=args.resume, refresh=args.refresh)
+    elif args.mode == "worker":
+        worker(args.node, args.queue)
+    else:
+        status(args.queue)